@@ -0,0 +1,29 @@
+"""Import helper for the benchmark scripts.
+
+Loads modules of the zse_hdo integration without executing its
+``__init__.py`` (which needs Home Assistant), so the pure-Python parts can
+be measured in a plain virtualenv.
+
+Author: Miroslav Burdych (@mburdych)
+GitHub: https://github.com/mburdych/ZSED-tarify
+Support: https://buymeacoffee.com/mburdych
+
+License: MIT
+"""
+
+import importlib
+import sys
+import types
+from pathlib import Path
+
+PACKAGE_DIR = Path(__file__).resolve().parent.parent / "custom_components" / "zse_hdo"
+PACKAGE_NAME = "zse_hdo"
+
+
+def load(module: str):
+    """Import zse_hdo.<module> without running the package __init__."""
+    if PACKAGE_NAME not in sys.modules:
+        package = types.ModuleType(PACKAGE_NAME)
+        package.__path__ = [str(PACKAGE_DIR)]
+        sys.modules[PACKAGE_NAME] = package
+    return importlib.import_module(f"{PACKAGE_NAME}.{module}")
@@ -0,0 +1,49 @@
+"""Benchmark of the JavaScript literal extractor.
+
+Parses synthetic pages of growing size and prints the time per page and
+per kilobyte. The per-kilobyte column stays flat as the page grows, which
+shows that extraction is linear in the page size.
+
+Usage: python benchmarks/bench_jsliteral.py
+
+Author: Miroslav Burdych (@mburdych)
+GitHub: https://github.com/mburdych/ZSED-tarify
+Support: https://buymeacoffee.com/mburdych
+
+License: MIT
+"""
+
+import re
+import timeit
+
+from _package import load
+from fixtures import make_page
+
+jsliteral = load("jsliteral")
+
+SIZES = [50, 200, 800, 3200]
+
+
+def extract(html: str, var_name: str):
+    """Same lookup the parser does in _extract_javascript_array."""
+    match = re.search(rf"var\s+{var_name}\s*=\s*(?=\[)", html)
+    data, _ = jsliteral.parse_js_literal(html, match.end())
+    return data
+
+
+def main() -> None:
+    print(f"{'codes':>7} {'page KiB':>10} {'ms/page':>10} {'us/KiB':>10}")
+    for codes in SIZES:
+        html = make_page(codes)
+        runs = max(1, 400 // codes)
+        seconds = min(timeit.repeat(
+            lambda: (extract(html, "household_rates"), extract(html, "business_rates")),
+            number=runs,
+            repeat=5,
+        )) / runs
+        kib = len(html) / 1024
+        print(f"{codes:>7} {kib:>10.1f} {seconds * 1e3:>10.2f} {seconds * 1e6 / kib:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""Benchmark of tariff evaluation on parsed schedules.
+
+Parses one synthetic page (or the first recorded snapshot with
+``--snapshot``) and prints the latency of each lookup in microseconds,
+averaged over random times spread across a week and over all HDO codes.
+Batch operations are reported per timestamp.
+
+Usage: python benchmarks/bench_lookup.py [codes] [--snapshot]
+
+Author: Miroslav Burdych (@mburdych)
+GitHub: https://github.com/mburdych/ZSED-tarify
+Support: https://buymeacoffee.com/mburdych
+
+License: MIT
+"""
+
+import asyncio
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List
+
+from _package import load
+from fixtures import load_snapshots, make_page
+
+costs = load("costs")
+parser = load("parser")
+
+DEFAULT_CODES = 2000
+LOOKUPS = 2000
+BATCH_SIZE = 100_000
+
+
+def per_call(func: Callable[[int], object], calls: int) -> float:
+    """Best average time of func(i) over calls, in microseconds."""
+    best = float("inf")
+    for _ in range(3):
+        started = time.perf_counter()
+        for i in range(calls):
+            func(i)
+        best = min(best, time.perf_counter() - started)
+    return best / calls * 1e6
+
+
+def main() -> None:
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    if "--snapshot" in sys.argv:
+        snapshots = load_snapshots()
+        if not snapshots:
+            sys.exit("No snapshots recorded - run record_snapshot.py first")
+        name, html = next(iter(snapshots.items()))
+    else:
+        codes = int(args[0]) if args else DEFAULT_CODES
+        name, html = f"synthetic-{codes}", make_page(codes)
+
+    zse = parser.ZSEHDOLiveParser()
+    page = zse._parse_page(html)
+    zse.cache.set(zse.url, page)
+
+    index = page["low_index"]
+    catalog = zse._page_catalog(page)
+    compiled = [page["schedules"][code]["compiled"] for code in page["codes"]]
+    codes = page["codes"]
+
+    rng = random.Random(145)
+    week = datetime(2026, 1, 5)
+    times: List[datetime] = [
+        week + timedelta(minutes=rng.randrange(7 * 24 * 60)) for _ in range(LOOKUPS)
+    ]
+    schedules = [compiled[rng.randrange(len(compiled))] for _ in range(LOOKUPS)]
+    pairs = [rng.sample(codes, 2) for _ in range(LOOKUPS)]
+    batch = [week + timedelta(minutes=15 * i) for i in range(BATCH_SIZE)]
+    readings = [0.25] * BATCH_SIZE
+
+    def common_week(i: int) -> None:
+        for _ in index.common_low(pairs[i], times[i], times[i] + timedelta(weeks=1)):
+            pass
+
+    def transitions_week(i: int) -> None:
+        for _ in schedules[i].transitions(times[i], times[i] + timedelta(weeks=1)):
+            pass
+
+    async def cached_now(calls: int) -> float:
+        started = time.perf_counter()
+        for i in range(calls):
+            await zse.is_low_tariff_now(codes[i % len(codes)])
+        return (time.perf_counter() - started) / calls * 1e6
+
+    results: Dict[str, float] = {
+        "is_low_at": per_call(lambda i: schedules[i].is_low_at(times[i]), LOOKUPS),
+        "next_switch": per_call(lambda i: schedules[i].next_switch(times[i]), LOOKUPS),
+        "transitions (1 week)": per_call(transitions_week, LOOKUPS),
+        "low_minutes (3 h)": per_call(
+            lambda i: schedules[i].low_minutes(i % 10080, 180), LOOKUPS
+        ),
+        "best_window (3 h in 24 h)": per_call(
+            lambda i: schedules[i].best_window(
+                times[i], times[i] + timedelta(days=1), 180
+            ),
+            LOOKUPS,
+        ),
+        "index low_codes_at": per_call(lambda i: index.low_codes_at(times[i]), LOOKUPS),
+        "index common_low (2 codes, 1 week)": per_call(common_week, LOOKUPS),
+        "catalog search (2-digit prefix)": per_call(
+            lambda i: catalog.search(str(codes[i % len(codes)])[:2]), LOOKUPS
+        ),
+        "parser is_low_tariff_now (cached)": asyncio.run(cached_now(LOOKUPS)),
+        "is_low_many (per timestamp)": per_call(
+            lambda i: schedules[i].is_low_many(batch), 1
+        ) / BATCH_SIZE,
+        "calculate_costs (per reading)": per_call(
+            lambda i: costs.calculate_costs(schedules[i], batch, readings, 0.1, 0.2), 1
+        ) / BATCH_SIZE,
+    }
+
+    print(f"{name}: {len(codes)} codes, NumPy {'on' if costs.np is not None else 'off'}")
+    for label, micros in results.items():
+        print(f"{label:>36} {micros:>10.3f} us")
+
+
+if __name__ == "__main__":
+    main()
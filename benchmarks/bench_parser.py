@@ -0,0 +1,129 @@
+"""Benchmark of fetching and parsing the HDO page.
+
+For every recorded snapshot and for synthetic pages of growing size
+prints:
+
+- extract: _extract_javascript_array for both rate tables (ms/page)
+- normalize: _normalize_schedule per HDO code (us/code)
+- parse: the whole _parse_page - extraction, normalization, compilation
+  and the cross-code index (ms/page, codes/s, MiB/s)
+- peak: peak memory allocated by one parse (tracemalloc)
+- fetch: cold get_all_schedules() from the local stand-in server
+  (streamed, stops after the rate tables) and a revalidation that the
+  server answers with 304
+
+Everything runs offline against 127.0.0.1.
+
+Usage: python benchmarks/bench_parser.py [codes ...]
+
+Author: Miroslav Burdych (@mburdych)
+GitHub: https://github.com/mburdych/ZSED-tarify
+Support: https://buymeacoffee.com/mburdych
+
+License: MIT
+"""
+
+import asyncio
+import sys
+import time
+import timeit
+import tracemalloc
+from typing import Callable, Tuple
+
+import aiohttp
+
+from _package import load
+from fixtures import benchmark_pages
+from server import StandInServer
+
+parser = load("parser")
+
+SIZES = [50, 500, 2000, 5000]
+FETCH_ROUNDS = 5
+
+
+def best_of(func: Callable[[], object], runs: int) -> float:
+    """Best time of one call in seconds."""
+    return min(timeit.repeat(func, number=runs, repeat=5)) / runs
+
+
+def peak_memory(func: Callable[[], object]) -> int:
+    """Peak bytes allocated while func runs."""
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+async def fetch_times(html: str) -> Tuple[float, float]:
+    """Best cold fetch+parse and best 304 revalidation time in seconds."""
+    async with StandInServer({"/": html}) as server, aiohttp.ClientSession() as session:
+        zse = parser.ZSEHDOLiveParser(session=session, url=server.url("/"))
+
+        cold = []
+        for _ in range(FETCH_ROUNDS):
+            zse.cache.invalidate()
+            started = time.perf_counter()
+            await zse.get_all_schedules()
+            cold.append(time.perf_counter() - started)
+
+        revalidate = []
+        for _ in range(FETCH_ROUNDS):
+            # Expired page → conditional GET
+            zse.cache.set(zse.url, zse.cache.peek(zse.url), stale=True)
+            started = time.perf_counter()
+            await zse.get_all_schedules()
+            revalidate.append(time.perf_counter() - started)
+
+    return min(cold), min(revalidate)
+
+
+def bench_page(name: str, html: str) -> None:
+    """Measure one page and print its row."""
+    zse = parser.ZSEHDOLiveParser()
+    codes = len(zse._parse_page(html)["codes"])
+    runs = max(1, 2000 // max(codes, 1))
+
+    extract = best_of(
+        lambda: [zse._extract_javascript_array(html, var) for var in parser.RATE_VARIABLES],
+        runs,
+    )
+
+    rates = [
+        rate
+        for var in parser.RATE_VARIABLES
+        for rate in zse._extract_javascript_array(html, var)
+    ]
+    normalize = best_of(
+        lambda: [zse._normalize_schedule(rate.get("intervals") or []) for rate in rates],
+        runs,
+    ) / max(len(rates), 1)
+
+    parse = best_of(lambda: zse._parse_page(html), runs)
+    peak = peak_memory(lambda: zse._parse_page(html))
+    cold, revalidate = asyncio.run(fetch_times(html))
+
+    mib = len(html.encode("utf-8")) / 2**20
+    print(
+        f"{name:>22} {codes:>6} {mib * 1024:>9.1f} {extract * 1e3:>9.2f} "
+        f"{normalize * 1e6:>9.1f} {parse * 1e3:>9.2f} {codes / parse:>9.0f} "
+        f"{mib / parse:>8.1f} {peak / 2**20:>8.2f} {cold * 1e3:>9.2f} {revalidate * 1e3:>8.2f}"
+    )
+
+
+def main() -> None:
+    sizes = [int(arg) for arg in sys.argv[1:]] or SIZES
+    print(
+        f"{'page':>22} {'codes':>6} {'KiB':>9} {'extr ms':>9} {'norm us':>9} "
+        f"{'parse ms':>9} {'codes/s':>9} {'MiB/s':>8} {'peak MiB':>8} "
+        f"{'fetch ms':>9} {'304 ms':>8}"
+    )
+    for name, html in benchmark_pages(sizes).items():
+        bench_page(name, html)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""Synthetic zsdis.sk page fixtures for the benchmark scripts.
+
+The generated pages mimic the structure of the live page: the HDO tables
+are embedded as ``var household_rates = [...]`` / ``var business_rates``
+JavaScript literals with unquoted keys, single-quoted strings and trailing
+commas, surrounded by unrelated HTML. Every code covers the whole day with
+alternating ``nt`` and ``vt`` intervals, and most codes have intervals
+that cross midnight (e.g. NT 22:00 - 04:00).
+
+Recorded copies of the live page (see record_snapshot.py) are read from
+the ``snapshots`` directory next to this file.
+
+Author: Miroslav Burdych (@mburdych)
+GitHub: https://github.com/mburdych/ZSED-tarify
+Support: https://buymeacoffee.com/mburdych
+
+License: MIT
+"""
+
+import random
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+
+SNAPSHOT_DIR = Path(__file__).resolve().parent / "snapshots"
+
+RATE_TYPES = ["DD2", "DD3", "DD5", "DD6", "DD8", "C22", "C25", "C26"]
+
+MEANINGS = {"nt": "Nízka tarifa", "vt": "Vysoká tarifa"}
+
+MINUTES_PER_DAY = 24 * 60
+
+_INTERVAL = (
+    "{{ t_type: '{t_type}', t_from: '{t_from}', t_to: '{t_to}', "
+    "weekday: {weekday}, weekend: {weekend}, "
+    "meaning: '{meaning}', for_rate: '{for_rate}', }}"
+)
+
+
+def _hhmm(minutes: int) -> str:
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def _day(rng: random.Random) -> List[Tuple[str, int, int]]:
+    """
+    Alternating NT/VT intervals covering one day, as (t_type, start, end).
+
+    The day is walked from a start up to 6 h after midnight, so the
+    intervals around midnight wrap (end < start) like on the live page.
+    """
+    first = rng.randrange(0, 25) * 15
+    limit = first + MINUTES_PER_DAY
+    intervals: List[Tuple[str, int, int]] = []
+    minute = first
+    while True:
+        nt_end = min(minute + rng.randrange(4, 16) * 15, limit - 15)
+        intervals.append(("nt", minute, nt_end))
+        vt_end = nt_end + rng.randrange(4, 16) * 15
+        if vt_end > limit - 60:
+            # Too little room for another NT block - VT runs to the start
+            intervals.append(("vt", nt_end, limit))
+            return intervals
+        intervals.append(("vt", nt_end, vt_end))
+        minute = vt_end
+
+
+def _rate(code: int, rng: random.Random) -> str:
+    """Render one rate object with its NT/VT intervals for workdays and weekends."""
+    for_rate = rng.choice(RATE_TYPES)
+    intervals: List[str] = []
+    for weekday, weekend in (("true", "false"), ("false", "true")):
+        for t_type, start, end in _day(rng):
+            intervals.append(_INTERVAL.format(
+                t_type=t_type,
+                t_from=_hhmm(start % MINUTES_PER_DAY),
+                t_to=_hhmm(end % MINUTES_PER_DAY),
+                weekday=weekday,
+                weekend=weekend,
+                meaning=MEANINGS[t_type],
+                for_rate=for_rate,
+            ))
+    return f"{{ code: {code}, intervals: [ {', '.join(intervals)}, ], }}"
+
+
+def make_page(codes: int, seed: int = 145) -> str:
+    """
+    Build a synthetic page with the given number of HDO codes.
+
+    Roughly two thirds of the codes go to household_rates, the rest to
+    business_rates, mirroring the live page.
+    """
+    rng = random.Random(seed)
+    household = codes * 2 // 3
+    household_rates = ",\n".join(_rate(code, rng) for code in range(1, household + 1))
+    business_rates = ",\n".join(_rate(code, rng) for code in range(household + 1, codes + 1))
+    filler = "<div class='row'><p>Lorem ipsum dolor sit amet.</p></div>\n" * 200
+    return (
+        "<!DOCTYPE html><html><head><title>ZSE HDO</title></head><body>\n"
+        f"{filler}"
+        "<script type='text/javascript'>\n"
+        f"var household_rates = [\n{household_rates},\n];\n"
+        f"var business_rates = [\n{business_rates},\n];\n"
+        "</script>\n"
+        f"{filler}"
+        "</body></html>\n"
+    )
+
+
+def load_snapshots() -> Dict[str, str]:
+    """Return recorded pages as file name → HTML (empty if none were recorded)."""
+    if not SNAPSHOT_DIR.is_dir():
+        return {}
+    return {
+        path.name: path.read_text(encoding="utf-8")
+        for path in sorted(SNAPSHOT_DIR.glob("*.html"))
+    }
+
+
+def benchmark_pages(sizes: Iterable[int]) -> Dict[str, str]:
+    """Recorded snapshots followed by synthetic pages of the given sizes."""
+    pages = load_snapshots()
+    for codes in sizes:
+        pages[f"synthetic-{codes}"] = make_page(codes)
+    return pages
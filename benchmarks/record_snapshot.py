@@ -0,0 +1,37 @@
+"""Record a snapshot of the live zsdis.sk page for the benchmarks.
+
+Downloads the full page once and stores it in ``benchmarks/snapshots``
+under today's date. All other benchmark scripts only read the stored
+files and run offline.
+
+Usage: python benchmarks/record_snapshot.py
+
+Author: Miroslav Burdych (@mburdych)
+GitHub: https://github.com/mburdych/ZSED-tarify
+Support: https://buymeacoffee.com/mburdych
+
+License: MIT
+"""
+
+import asyncio
+from datetime import date
+
+from _package import load
+from fixtures import SNAPSHOT_DIR
+
+parser = load("parser")
+
+
+async def record() -> None:
+    """Fetch the page and write it to the snapshot directory."""
+    async with parser.ZSEHDOLiveParser() as live:
+        html = await live.fetch_page()
+
+    SNAPSHOT_DIR.mkdir(exist_ok=True)
+    path = SNAPSHOT_DIR / f"zsdis-{date.today().isoformat()}.html"
+    path.write_text(html, encoding="utf-8")
+    print(f"Saved {len(html) / 1024:.1f} KiB to {path}")
+
+
+if __name__ == "__main__":
+    asyncio.run(record())
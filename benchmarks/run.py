@@ -0,0 +1,39 @@
+"""Run the whole benchmark suite.
+
+Runs the literal extractor, parser/fetch and lookup benchmarks one after
+another with their default sizes. Needs no network access - pages come
+from fixtures.py and recorded snapshots, fetches go to the local
+stand-in server.
+
+Usage: python benchmarks/run.py
+
+Author: Miroslav Burdych (@mburdych)
+GitHub: https://github.com/mburdych/ZSED-tarify
+Support: https://buymeacoffee.com/mburdych
+
+License: MIT
+"""
+
+import sys
+
+import bench_jsliteral
+import bench_lookup
+import bench_parser
+
+SUITE = [
+    ("JavaScript literal extraction", bench_jsliteral),
+    ("Fetch and parse", bench_parser),
+    ("Tariff lookups", bench_lookup),
+]
+
+
+def main() -> None:
+    # Each benchmark reads its own arguments - run them with the defaults
+    del sys.argv[1:]
+    for title, module in SUITE:
+        print(f"\n== {title} ==")
+        module.main()
+
+
+if __name__ == "__main__":
+    main()
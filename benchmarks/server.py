@@ -0,0 +1,118 @@
+"""Local stand-in for the zsdis.sk page.
+
+Serves HTML pages from memory on 127.0.0.1 so fetch benchmarks run
+offline and are not affected by the real site. Like the live server it
+sends an ETag, answers a matching ``If-None-Match`` with 304 and streams
+the body in chunks, so conditional GET and early stream termination are
+exercised the same way.
+
+Usage::
+
+    async with StandInServer({"/": html}) as server:
+        url = server.url("/")
+
+Author: Miroslav Burdych (@mburdych)
+GitHub: https://github.com/mburdych/ZSED-tarify
+Support: https://buymeacoffee.com/mburdych
+
+License: MIT
+"""
+
+import asyncio
+import hashlib
+from typing import Dict, Optional
+
+from aiohttp import web
+
+# Size of the body chunks written to the client
+CHUNK_SIZE = 8192
+
+
+class StandInServer:
+    """In-memory HTTP server with ETag support."""
+
+    def __init__(self, pages: Dict[str, str], latency: float = 0.0, host: str = "127.0.0.1"):
+        """
+        Initialize server.
+
+        Args:
+            pages: Path → HTML served on that path
+            latency: Delay in seconds before each response (simulated network)
+            host: Interface to bind
+        """
+        self.latency = latency
+        self.host = host
+        self.port: Optional[int] = None
+        self.requests = 0
+        self.not_modified = 0
+        self.bytes_sent = 0
+        self._pages: Dict[str, bytes] = {}
+        self._etags: Dict[str, str] = {}
+        self._runner: Optional[web.AppRunner] = None
+        for path, html in pages.items():
+            self.set_page(path, html)
+
+    def set_page(self, path: str, html: str) -> None:
+        """Replace the page on a path (its ETag changes with the content)."""
+        body = html.encode("utf-8")
+        self._pages[path] = body
+        self._etags[path] = f'"{hashlib.sha1(body).hexdigest()}"'
+
+    def url(self, path: str = "/") -> str:
+        """Return the absolute URL of a served path."""
+        return f"http://{self.host}:{self.port}{path}"
+
+    async def _handle(self, request: web.Request) -> web.StreamResponse:
+        """Serve one page, 304 when the client already has it."""
+        self.requests += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        body = self._pages.get(request.path)
+        if body is None:
+            raise web.HTTPNotFound()
+
+        etag = self._etags[request.path]
+        if request.headers.get("If-None-Match") == etag:
+            self.not_modified += 1
+            return web.Response(status=304, headers={"ETag": etag})
+
+        response = web.StreamResponse(headers={"ETag": etag})
+        response.content_type = "text/html"
+        response.charset = "utf-8"
+        await response.prepare(request)
+
+        try:
+            for start in range(0, len(body), CHUNK_SIZE):
+                await response.write(body[start:start + CHUNK_SIZE])
+                self.bytes_sent += min(CHUNK_SIZE, len(body) - start)
+            await response.write_eof()
+        except ConnectionResetError:
+            # The client stopped reading once it had the rate tables
+            pass
+        return response
+
+    async def start(self) -> None:
+        """Start listening on a free port."""
+        app = web.Application()
+        app.router.add_get("/{tail:.*}", self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, 0)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        """Stop the server."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self) -> "StandInServer":
+        """Start on enter."""
+        await self.start()
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        """Stop on exit."""
+        await self.stop()
@@ -12,16 +12,26 @@ License: MIT
 
 import logging
 
+from homeassistant import config_entries
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import ConfigEntryNotReady
+from homeassistant.helpers import config_validation as cv, instance_id
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.typing import ConfigType
 
+from .cache import ZSEHDOPageCache
+from .store import ZSEHDOScheduleStore
 from .parser import ZSEHDOLiveParser
 from .coordinator import ZSEHDOCoordinator
+from .services import async_setup_services
 from .const import (
     DOMAIN, 
     CONF_HDO_NUMBER, 
     CONF_UPDATE_FREQUENCY,
+    DATA_COORDINATOR,
+    DATA_PAGE_CACHE,
+    DATA_STORE,
     DEFAULT_UPDATE_FREQUENCY
 )
 
@@ -29,6 +39,89 @@ _LOGGER = logging.getLogger(__name__)
 
 PLATFORMS = ["sensor"]
 
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+
+def get_page_cache(hass: HomeAssistant) -> ZSEHDOPageCache:
+    """Return the domain-wide page cache shared by all config entries."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if DATA_PAGE_CACHE not in domain_data:
+        domain_data[DATA_PAGE_CACHE] = ZSEHDOPageCache(
+            task_factory=hass.async_create_background_task
+        )
+    return domain_data[DATA_PAGE_CACHE]
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up ZSE HDO services."""
+    async_setup_services(hass)
+    return True
+
+
+async def async_get_coordinator(hass: HomeAssistant) -> ZSEHDOCoordinator:
+    """Return the domain-wide coordinator, creating it on first use."""
+    # ID inštalácie určuje jej stály posun naplánovaných aktualizácií
+    # (načíta sa pred kontrolou, aby medzi kontrolou a vytvorením nebol await)
+    hass_instance_id = await instance_id.async_get(hass)
+    
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if DATA_COORDINATOR in domain_data:
+        return domain_data[DATA_COORDINATOR]
+    
+    # Vytvorenie parsera (so zdieľanou cache stránky, parsovanie v executore).
+    # Metriky zapína až diagnostický sensor metrík, ak je povolený.
+    session = async_get_clientsession(hass)
+    parser = ZSEHDOLiveParser(
+        session=session,
+        cache=get_page_cache(hass),
+        executor=hass.async_add_executor_job
+    )
+    
+    if DATA_STORE not in domain_data:
+        domain_data[DATA_STORE] = ZSEHDOScheduleStore(hass)
+    
+    # Coordinator patrí celej doméne, nie config entry, ktorá sa práve nastavuje
+    token = config_entries.current_entry.set(None)
+    try:
+        coordinator = ZSEHDOCoordinator(
+            hass=hass,
+            parser=parser,
+            store=domain_data[DATA_STORE],
+            instance_id=hass_instance_id
+        )
+    finally:
+        config_entries.current_entry.reset(token)
+    
+    domain_data[DATA_COORDINATOR] = coordinator
+    await coordinator.async_register_shutdown()
+    
+    return coordinator
+
+
+async def _async_restore_snapshot(hass: HomeAssistant, coordinator: ZSEHDOCoordinator) -> None:
+    """Load the stored snapshot once and seed the page cache with it."""
+    store = coordinator.store
+    if store is None or store.loaded:
+        return
+    
+    # Súbežne nastavované entries čakajú na jedno načítanie z disku
+    snapshot = await get_page_cache(hass).async_single_flight(
+        f"{DOMAIN}:store", store.async_load
+    )
+    if snapshot:
+        coordinator.parser.restore_page(snapshot)
+
+
+async def _async_release_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Unregister an entry and shut the coordinator down after the last one."""
+    coordinator = hass.data.get(DOMAIN, {}).get(DATA_COORDINATOR)
+    if coordinator is None:
+        return
+    
+    if coordinator.async_remove_entry(entry.entry_id):
+        hass.data[DOMAIN].pop(DATA_COORDINATOR)
+        await coordinator.async_shutdown()
+
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up ZSE HDO from a config entry."""
@@ -40,26 +133,38 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         f"(frequency: {update_frequency})"
     )
     
-    # Vytvorenie parsera
-    session = async_get_clientsession(hass)
-    parser = ZSEHDOLiveParser(session=session)
-    
-    # Vytvorenie coordinatora
-    coordinator = ZSEHDOCoordinator(
-        hass=hass,
-        parser=parser,
-        hdo_number=hdo_number,
-        update_frequency=update_frequency
-    )
+    # Jeden coordinator pre všetky HDO čísla
+    coordinator = await async_get_coordinator(hass)
+    await _async_restore_snapshot(hass, coordinator)
+    coordinator.async_add_entry(entry.entry_id, hdo_number, update_frequency)
+    
+    # Prvotné načítanie dát - zo snapshotu hneď, inak z webu
+    if coordinator.data is None:
+        schedules = coordinator.parser.get_cached_schedules()
+        if schedules is not None:
+            coordinator.async_set_updated_data(schedules)
+            hass.async_create_background_task(
+                coordinator.async_revalidate(),
+                f"{DOMAIN}_revalidate"
+            )
+        else:
+            # Súbežne nastavované entries čakajú na jedno prvotné načítanie
+            await get_page_cache(hass).async_single_flight(
+                f"{DOMAIN}:first_refresh", coordinator.async_refresh
+            )
+    
+    if coordinator.data is None:
+        await _async_release_entry(hass, entry)
+        raise ConfigEntryNotReady(f"Error fetching HDO data: {coordinator.last_exception}")
     
-    # Prvotné načítanie dát
-    await coordinator.async_config_entry_first_refresh()
+    if hdo_number not in coordinator.data:
+        await _async_release_entry(hass, entry)
+        raise ConfigEntryNotReady(f"HDO {hdo_number} not found on ZSE website")
     
     # Uloženie do hass.data
-    hass.data.setdefault(DOMAIN, {})
     hass.data[DOMAIN][entry.entry_id] = {
         "coordinator": coordinator,
-        "parser": parser,
+        "parser": coordinator.parser,
         "hdo_number": hdo_number,
     }
     
@@ -75,5 +180,15 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     
     if unload_ok:
         hass.data[DOMAIN].pop(entry.entry_id)
+        await _async_release_entry(hass, entry)
     
     return unload_ok
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the stored snapshot when the last config entry is removed."""
+    if hass.config_entries.async_entries(DOMAIN):
+        return
+    
+    store = hass.data.get(DOMAIN, {}).pop(DATA_STORE, None) or ZSEHDOScheduleStore(hass)
+    await store.async_remove()
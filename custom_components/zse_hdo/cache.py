@@ -0,0 +1,171 @@
+"""
+ZSE HDO Page Cache
+==================
+
+Zdieľaná cache pre stiahnutú a sparsovanú ZSE stránku, spoločná pre všetky
+config entries integrácie.
+
+Author: Miroslav Burdych (@mburdych)
+GitHub: https://github.com/mburdych/ZSED-tarify
+Support: https://buymeacoffee.com/mburdych
+
+License: MIT
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Coroutine, Dict, Optional, Tuple
+
+from .const import PAGE_CACHE_TTL, PAGE_CACHE_MAX_SIZE
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class ZSEHDOPageCache:
+    """TTL cache s obmedzenou veľkosťou (LRU) pre sparsované ZSE stránky."""
+
+    def __init__(
+        self,
+        ttl: float = PAGE_CACHE_TTL,
+        max_size: int = PAGE_CACHE_MAX_SIZE,
+        task_factory: Optional[
+            Callable[[Coroutine[Any, Any, Any], str], "asyncio.Future[Any]"]
+        ] = None,
+    ):
+        """
+        Initialize cache.
+
+        Args:
+            ttl: Životnosť záznamu v sekundách
+            max_size: Maximálny počet záznamov (najstaršie sa vyhadzujú)
+            task_factory: Spúšťač zdieľaných požiadaviek (coroutine, názov),
+                napr. hass.async_create_background_task - úloha sa zruší
+                pri zastavení Home Assistanta; ak None, asyncio.create_task
+        """
+        self.ttl = ttl
+        self.max_size = max_size
+        self._task_factory = task_factory
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[str, "asyncio.Future[Any]"] = {}
+        # Počet volajúcich, ktorí na požiadavku ešte čakajú
+        self._waiters: Dict["asyncio.Future[Any]", int] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def __len__(self) -> int:
+        """Return number of stored entries (vrátane expirovaných)."""
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Vráti platný (neexpirovaný) záznam.
+
+        Args:
+            key: Kľúč záznamu (typicky URL)
+
+        Returns:
+            Uložená hodnota alebo None ak neexistuje / expirovala
+        """
+        entry = self._entries.get(key)
+        if entry is None or time.monotonic() - entry[0] >= self.ttl:
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def peek(self, key: str) -> Optional[Any]:
+        """
+        Vráti záznam aj keď už expiroval (napr. pre podmienený GET).
+
+        Args:
+            key: Kľúč záznamu (typicky URL)
+
+        Returns:
+            Uložená hodnota alebo None ak neexistuje
+        """
+        entry = self._entries.get(key)
+        return entry[1] if entry is not None else None
+
+    def set(self, key: str, value: Any, stale: bool = False) -> None:
+        """
+        Uloží hodnotu do cache.
+
+        Args:
+            key: Kľúč záznamu (typicky URL)
+            value: Hodnota na uloženie
+            stale: Uložiť ako už expirovanú (dostupnú len cez peek)
+        """
+        stored_at = float("-inf") if stale else time.monotonic()
+        self._entries[key] = (stored_at, value)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_size:
+            evicted, _ = self._entries.popitem(last=False)
+            _LOGGER.debug(f"Evicted '{evicted}' from page cache")
+
+    def invalidate(self, key: Optional[str] = None) -> None:
+        """
+        Zmaže záznam (alebo celú cache ak key je None).
+
+        Args:
+            key: Kľúč záznamu alebo None pre všetky
+        """
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+
+    async def async_single_flight(
+        self, key: str, factory: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """
+        Spustí factory najviac raz naraz pre daný kľúč.
+
+        Súbežní volajúci s rovnakým kľúčom sa pripoja k už bežiacej
+        požiadavke a dostanú jej výsledok (alebo výnimku). Keď odíde
+        (zruší sa) posledný čakajúci, zruší sa aj požiadavka.
+
+        Args:
+            key: Kľúč požiadavky
+            factory: Coroutine function, ktorá vykoná samotnú prácu
+
+        Returns:
+            Výsledok factory
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            name = f"zse_hdo single flight {key}"
+            if self._task_factory is not None:
+                task = self._task_factory(factory(), name)
+            else:
+                task = asyncio.create_task(factory(), name=name)
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._finish_flight(key, done))
+        else:
+            self.coalesced += 1
+            _LOGGER.debug(f"Joining in-flight request '{key}'")
+
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            # shield - zrušenie jedného volajúceho nezruší požiadavku ostatným
+            return await asyncio.shield(task)
+        finally:
+            self._waiters[task] -= 1
+            if not self._waiters[task]:
+                del self._waiters[task]
+                if not task.done():
+                    _LOGGER.debug(f"Cancelling request '{key}' - no callers left")
+                    task.cancel()
+
+    def _finish_flight(self, key: str, task: "asyncio.Future[Any]") -> None:
+        """Odstráni dokončenú požiadavku a vyzdvihne jej výnimku."""
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            # Zabráni "exception was never retrieved" ak všetci volajúci odišli
+            task.exception()
@@ -0,0 +1,133 @@
+"""
+ZSE HDO Code Catalog
+====================
+
+Katalóg HDO kódov stránky pre výber v config flow - ku každému kódu
+kategória, typ sadzby a počet hodín nízkej tarify za deň. Vytvára sa raz
+pre každú stiahnutú stránku a vyhľadáva sa v ňom podľa začiatku čísla
+(binárne vyhľadanie v zoradených reťazcoch) alebo typu sadzby.
+
+Author: Miroslav Burdych (@mburdych)
+GitHub: https://github.com/mburdych/ZSED-tarify
+Support: https://buymeacoffee.com/mburdych
+
+License: MIT
+"""
+
+from bisect import bisect_left
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from .schedule import MINUTES_PER_DAY, CompiledSchedule
+
+# Názvy kategórií v popise kódu
+CATEGORY_LABELS = {"household": "domácnosť", "business": "podnikateľ"}
+
+
+def format_hours(minutes: int) -> str:
+    """Minúty ako hodiny bez zbytočných desatinných miest (napr. '7.5 h')."""
+    return f"{minutes / 60:.1f}".rstrip("0").rstrip(".") + " h"
+
+
+class HDOCatalog:
+    """Katalóg HDO kódov s popisom a vyhľadávaním."""
+
+    __slots__ = ("codes", "entries", "_keys")
+
+    def __init__(self, schedules: Mapping[int, Mapping[str, Any]]):
+        """
+        Vytvorí katalóg (raz pre každú stiahnutú stránku).
+
+        Args:
+            schedules: Rozvrhy všetkých HDO kódov (s 'category', 'rate_type'
+                a 'compiled')
+        """
+        self.codes: Tuple[int, ...] = tuple(sorted(schedules))
+        self.entries: Dict[int, Dict[str, Any]] = {}
+
+        for code in self.codes:
+            schedule = schedules[code]
+            compiled: CompiledSchedule = schedule["compiled"]
+            # Utorok a nedeľa - pred nimi je deň rovnakého typu, takže
+            # periódy cez polnoc z iného typu dňa do nich nezasahujú
+            workday = compiled.low_minutes(MINUTES_PER_DAY, MINUTES_PER_DAY)
+            weekend = compiled.low_minutes(6 * MINUTES_PER_DAY, MINUTES_PER_DAY)
+
+            summary = f"NT {format_hours(workday)}"
+            if weekend != workday:
+                summary += f", víkend {format_hours(weekend)}"
+
+            self.entries[code] = {
+                "code": code,
+                "category": schedule.get("category"),
+                "rate_type": schedule.get("rate_type", "Unknown"),
+                "workday_low_minutes": workday,
+                "weekend_low_minutes": weekend,
+                "summary": summary,
+            }
+
+        # Kódy ako reťazce v lexikografickom poradí - prefix je súvislý úsek
+        self._keys: Tuple[str, ...] = tuple(sorted(str(code) for code in self.codes))
+
+    def __len__(self) -> int:
+        """Return number of HDO codes in the catalog."""
+        return len(self.codes)
+
+    def __contains__(self, code: object) -> bool:
+        """Return True if the HDO code is in the catalog."""
+        return code in self.entries
+
+    def get(self, code: int) -> Optional[Dict[str, Any]]:
+        """Položka katalógu pre HDO kód alebo None."""
+        return self.entries.get(code)
+
+    def search(self, query: str = "", category: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Vyhľadá HDO kódy.
+
+        Číselný dopyt hľadá podľa začiatku kódu ("14" → 14, 140-149,
+        1400, ...), iný podľa začiatku typu sadzby bez ohľadu na veľkosť
+        písmen ("d2" → D2, D25, ...). Prázdny dopyt vráti všetky kódy.
+
+        Args:
+            query: Začiatok HDO kódu alebo typu sadzby
+            category: Len kódy z kategórie ('household', 'business'), None = všetky
+
+        Returns:
+            Položky katalógu zoradené podľa kódu
+        """
+        query = query.strip()
+
+        if not query:
+            codes = list(self.codes)
+        elif query.isdigit():
+            # ':' nasleduje v ASCII hneď za '9' - koniec úseku s daným prefixom
+            start = bisect_left(self._keys, query)
+            end = bisect_left(self._keys, query + ":", start)
+            codes = sorted(int(key) for key in self._keys[start:end])
+        else:
+            prefix = query.casefold()
+            codes = [
+                code
+                for code in self.codes
+                if self.entries[code]["rate_type"].casefold().startswith(prefix)
+            ]
+
+        return [
+            self.entries[code]
+            for code in codes
+            if category is None or self.entries[code]["category"] == category
+        ]
+
+    def label(self, code: int) -> str:
+        """
+        Popis kódu pre výber, napr. '145 · D2 · domácnosť · NT 8 h'.
+
+        Args:
+            code: HDO kód z katalógu
+
+        Returns:
+            Popis kódu
+        """
+        entry = self.entries[code]
+        category = CATEGORY_LABELS.get(entry["category"], entry["category"])
+        return f"{code} · {entry['rate_type']} · {category} · {entry['summary']}"
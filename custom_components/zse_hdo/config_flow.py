@@ -1,6 +1,8 @@
 """Config flow for ZSE HDO Live integration.
 
-Handles configuration and options flow for the integration.
+Handles configuration and options flow for the integration. HDO numbers
+are searched in a catalog of codes that is served from the shared page
+cache while it is fresh, so adding a code usually needs no download.
 
 Author: Miroslav Burdych (@mburdych)
 GitHub: https://github.com/mburdych/ZSED-tarify
@@ -10,7 +12,7 @@ License: MIT
 """
 
 import logging
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 import voluptuous as vol
 
@@ -23,14 +25,26 @@ from .const import (
     DOMAIN, 
     CONF_HDO_NUMBER, 
     CONF_UPDATE_FREQUENCY,
+    CONF_SEARCH,
+    CONF_CATEGORY,
     UPDATE_FREQUENCIES,
     DEFAULT_UPDATE_FREQUENCY
 )
+from .catalog import HDOCatalog
 from .parser import ZSEHDOLiveParser
+from . import get_page_cache
 
 _LOGGER = logging.getLogger(__name__)
 
 
+# Filter kategórie pri vyhľadávaní (None = všetky)
+CATEGORY_FILTERS = {
+    "all": "Všetky",
+    "household": "Domácnosti",
+    "business": "Podnikatelia",
+}
+
+
 class ZSEHDOConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """Handle a config flow for ZSE HDO."""
 
@@ -38,73 +52,131 @@ class ZSEHDOConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
     def __init__(self):
         """Initialize the config flow."""
-        self._hdo_numbers = None
+        self._catalog: Optional[HDOCatalog] = None
+        self._matches: List[int] = []
         self._errors = {}
 
     async def async_step_user(self, user_input: Optional[Dict[str, Any]] = None):
-        """Handle the initial step - load HDO numbers from ZSE website."""
+        """Handle the initial step - search the HDO code catalog."""
         self._errors = {}
 
-        if user_input is not None:
-            # Validácia HDO čísla - konvertuj na int
-            hdo_number = int(user_input[CONF_HDO_NUMBER])
-            update_frequency = user_input.get(CONF_UPDATE_FREQUENCY, DEFAULT_UPDATE_FREQUENCY)
-            
-            # Kontrola duplicity
-            await self.async_set_unique_id(f"zse_hdo_{hdo_number}")
-            self._abort_if_unique_id_configured()
-            
-            return self.async_create_entry(
-                title=f"ZSE HDO {hdo_number}",
-                data={
-                    CONF_HDO_NUMBER: hdo_number,
-                    CONF_UPDATE_FREQUENCY: update_frequency
-                }
-            )
+        if self._catalog is None:
+            self._catalog = await self._async_load_catalog()
 
-        # Načítanie zoznamu HDO čísel z webu
-        if self._hdo_numbers is None:
-            try:
-                session = aiohttp_client.async_get_clientsession(self.hass)
-                parser = ZSEHDOLiveParser(session=session)
-                
-                _LOGGER.info("Fetching HDO numbers from ZSE website...")
-                self._hdo_numbers = await parser.get_all_hdo_numbers()
-                
-                # Zoradi HDO čísla vzostupne
-                self._hdo_numbers.sort()
-                
-                _LOGGER.info(f"Found {len(self._hdo_numbers)} HDO numbers (sorted)")
-                
-            except Exception as err:
-                _LOGGER.error(f"Failed to fetch HDO numbers: {err}")
-                self._errors["base"] = "cannot_connect"
-                self._hdo_numbers = []
-
-        # Zobrazenie formulára s frekvenciou
-        data_schema = vol.Schema({
-            vol.Required(CONF_HDO_NUMBER): vol.In({
-                str(hdo): f"HDO {hdo}" 
-                for hdo in self._hdo_numbers
-            }) if self._hdo_numbers else cv.string,
-            vol.Required(
-                CONF_UPDATE_FREQUENCY, 
-                default=DEFAULT_UPDATE_FREQUENCY
-            ): vol.In({
-                key: config["label"]
-                for key, config in UPDATE_FREQUENCIES.items()
-            })
-        })
+        if not self._catalog:
+            # Bez katalógu sa HDO číslo zadá ručne
+            return await self.async_step_manual()
+
+        if user_input is not None:
+            category = user_input.get(CONF_CATEGORY, "all")
+            configured = self._async_current_ids()
+            self._matches = [
+                entry["code"]
+                for entry in self._catalog.search(
+                    user_input.get(CONF_SEARCH, ""),
+                    None if category == "all" else category,
+                )
+                if f"zse_hdo_{entry['code']}" not in configured
+            ]
+
+            if self._matches:
+                return await self.async_step_select()
+
+            self._errors["base"] = "no_match"
 
         return self.async_show_form(
             step_id="user",
-            data_schema=data_schema,
+            data_schema=vol.Schema({
+                vol.Optional(CONF_SEARCH, default=""): cv.string,
+                vol.Optional(CONF_CATEGORY, default="all"): vol.In(CATEGORY_FILTERS),
+            }),
             errors=self._errors,
-            description_placeholders={
-                "hdo_count": str(len(self._hdo_numbers)) if self._hdo_numbers else "0"
+            description_placeholders={"hdo_count": str(len(self._catalog))}
+        )
+
+    async def async_step_select(self, user_input: Optional[Dict[str, Any]] = None):
+        """Handle selection of an HDO number from the search results."""
+        if user_input is not None:
+            return await self._async_create_entry(user_input)
+
+        return self.async_show_form(
+            step_id="select",
+            data_schema=vol.Schema({
+                vol.Required(CONF_HDO_NUMBER): vol.In({
+                    str(hdo): self._catalog.label(hdo)
+                    for hdo in self._matches
+                }),
+                vol.Required(
+                    CONF_UPDATE_FREQUENCY, 
+                    default=DEFAULT_UPDATE_FREQUENCY
+                ): vol.In({
+                    key: config["label"]
+                    for key, config in UPDATE_FREQUENCIES.items()
+                })
+            }),
+            description_placeholders={"match_count": str(len(self._matches))}
+        )
+
+    async def async_step_manual(self, user_input: Optional[Dict[str, Any]] = None):
+        """Handle manual entry of an HDO number when the catalog is unavailable."""
+        if user_input is not None:
+            return await self._async_create_entry(user_input)
+
+        return self.async_show_form(
+            step_id="manual",
+            data_schema=vol.Schema({
+                vol.Required(CONF_HDO_NUMBER): cv.string,
+                vol.Required(
+                    CONF_UPDATE_FREQUENCY, 
+                    default=DEFAULT_UPDATE_FREQUENCY
+                ): vol.In({
+                    key: config["label"]
+                    for key, config in UPDATE_FREQUENCIES.items()
+                })
+            }),
+            errors={"base": "cannot_connect"}
+        )
+
+    async def _async_create_entry(self, user_input: Dict[str, Any]):
+        """Create the config entry for the chosen HDO number."""
+        # Validácia HDO čísla - konvertuj na int
+        hdo_number = int(user_input[CONF_HDO_NUMBER])
+        update_frequency = user_input.get(CONF_UPDATE_FREQUENCY, DEFAULT_UPDATE_FREQUENCY)
+        
+        # Kontrola duplicity
+        await self.async_set_unique_id(f"zse_hdo_{hdo_number}")
+        self._abort_if_unique_id_configured()
+        
+        return self.async_create_entry(
+            title=f"ZSE HDO {hdo_number}",
+            data={
+                CONF_HDO_NUMBER: hdo_number,
+                CONF_UPDATE_FREQUENCY: update_frequency
             }
         )
 
+    async def _async_load_catalog(self) -> Optional[HDOCatalog]:
+        """Load the HDO code catalog - from the shared page cache when fresh."""
+        session = aiohttp_client.async_get_clientsession(self.hass)
+        parser = ZSEHDOLiveParser(
+            session=session,
+            cache=get_page_cache(self.hass),
+            executor=self.hass.async_add_executor_job
+        )
+
+        try:
+            catalog = await parser.get_catalog()
+        except Exception as err:
+            # Starší katalóg (napr. počas výpadku webu) je lepší ako ručné zadanie
+            catalog = parser.get_cached_catalog()
+            if catalog is None:
+                _LOGGER.error(f"Failed to fetch HDO numbers: {err}")
+                return None
+            _LOGGER.warning(f"Failed to refresh HDO numbers, using cached catalog: {err}")
+
+        _LOGGER.info(f"HDO catalog has {len(catalog)} HDO numbers")
+        return catalog
+
     @staticmethod
     @callback
     def async_get_options_flow(config_entry):
@@ -12,18 +12,66 @@ DOMAIN = "zse_hdo"
 # Config
 CONF_HDO_NUMBER = "hdo_number"
 CONF_UPDATE_FREQUENCY = "update_frequency"
+# Vyhľadávanie v katalógu kódov (config flow)
+CONF_SEARCH = "search"
+CONF_CATEGORY = "category"
 
 # Update frequencies (in seconds)
 UPDATE_FREQUENCIES = {
     "5min": {"label": "Každých 5 minút", "seconds": 300, "type": "interval"},
     "1hour": {"label": "Každú hodinu", "seconds": 3600, "type": "interval"},
-    "1day": {"label": "1× denne (03:00)", "seconds": 86400, "type": "scheduled"},
-    "1week": {"label": "1× týždenne (pondelok 03:00)", "seconds": 604800, "type": "scheduled"},
-    "1month": {"label": "1× mesačne (1. deň 03:00)", "seconds": 2592000, "type": "scheduled"}
+    "1day": {"label": "1× denne (03:00–05:00)", "seconds": 86400, "type": "scheduled"},
+    "1week": {"label": "1× týždenne (pondelok 03:00–05:00)", "seconds": 604800, "type": "scheduled"},
+    "1month": {"label": "1× mesačne (1. deň 03:00–05:00)", "seconds": 2592000, "type": "scheduled"}
 }
 
 # Scheduled update time (for 1day/1week/1month)
 SCHEDULED_UPDATE_HOUR = 3  # 03:00
+# Každá inštalácia má stály posun v tomto okne (03:00–05:00), aby web ZSE
+# nedostal všetky požiadavky v tú istú sekundu
+SCHEDULED_UPDATE_WINDOW = 7200  # seconds
+
+# Adaptívny interval naplánovaných aktualizácií - pri zriedkavých zmenách
+# rozvrhu sa web kontroluje ADAPTIVE_CHECKS_PER_CHANGE-krát za odhadovaný
+# čas medzi zmenami, najviac ADAPTIVE_MAX_STRETCH-krát zriedkavejšie než
+# zvolená frekvencia a nie zriedkavejšie než ADAPTIVE_MAX_INTERVAL
+ADAPTIVE_CHECKS_PER_CHANGE = 4
+ADAPTIVE_MAX_STRETCH = 4
+ADAPTIVE_MAX_INTERVAL = 2592000  # seconds (30 days)
+# Počet posledných zmien rozvrhu uchovaných v snapshote
+CHANGE_HISTORY_SIZE = 8
+
+# Jeden coordinator pre všetky HDO čísla (hass.data[DOMAIN][DATA_COORDINATOR])
+DATA_COORDINATOR = "coordinator"
+
+# Zdieľaná cache stránky (hass.data[DOMAIN][DATA_PAGE_CACHE])
+DATA_PAGE_CACHE = "page_cache"
+PAGE_CACHE_TTL = 120  # seconds
+PAGE_CACHE_MAX_SIZE = 8
+
+# Config entry, ktorá poskytuje spoločný diagnostický sensor metrík
+# (hass.data[DOMAIN][DATA_METRICS_ENTRY])
+DATA_METRICS_ENTRY = "metrics_entry"
+METRICS_UNIQUE_ID = "zse_hdo_metrics"
+
+# Snapshot rozvrhov na disku (hass.data[DOMAIN][DATA_STORE])
+DATA_STORE = "store"
+STORAGE_VERSION = 1
+STORAGE_SAVE_DELAY = 10  # seconds
+
+# Výpadok webu ZSE - posledné platné rozvrhy sa ponechajú a sťahovanie
+# sa opakuje s exponenciálnym odstupom (s náhodným rozptylom)
+RETRY_BASE_DELAY = 60  # seconds
+RETRY_MAX_DELAY = 1800  # seconds
+# Po toľkých chybách za sebou sa web ZSE nechá na dlhšie na pokoji (circuit breaker)
+CIRCUIT_BREAKER_THRESHOLD = 5
+CIRCUIT_BREAKER_COOLDOWN = 7200  # seconds
+
+# Služby
+SERVICE_GET_TRANSITIONS = "get_transitions"
+SERVICE_CALCULATE_COST = "calculate_cost"
+SERVICE_FIND_WINDOW = "find_window"
+MAX_TRANSITION_DAYS = 366
 
 # Default frequency
 DEFAULT_UPDATE_FREQUENCY = "1week"
@@ -1,6 +1,9 @@
 """ZSE HDO Data Coordinator.
 
-Manages data fetching and updates for ZSE HDO integration.
+Manages data fetching and updates for ZSE HDO integration. One coordinator
+serves all configured HDO numbers - it holds the schedules of every code
+from the ZSE page and entities read their own code from it. Scheduled
+updates, retries after errors and tariff switches share one timer.
 
 Author: Miroslav Burdych (@mburdych)
 GitHub: https://github.com/mburdych/ZSED-tarify
@@ -9,160 +12,461 @@ Support: https://buymeacoffee.com/mburdych
 License: MIT
 """
 import logging
-from datetime import datetime, timedelta, time
-from typing import Dict, Optional
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, Optional, Set
 
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
-from homeassistant.helpers.event import async_track_point_in_time
+from homeassistant.helpers.event import async_track_point_in_utc_time
 from homeassistant.util import dt as dt_util
 
 from .const import (
-    DOMAIN, 
-    UPDATE_FREQUENCIES, 
-    DEFAULT_UPDATE_FREQUENCY, 
-    CONF_UPDATE_FREQUENCY,
-    SCHEDULED_UPDATE_HOUR
+    DOMAIN,
+    UPDATE_FREQUENCIES,
+    DEFAULT_UPDATE_FREQUENCY,
+    SCHEDULED_UPDATE_WINDOW,
+    RETRY_BASE_DELAY,
+    RETRY_MAX_DELAY,
+    CIRCUIT_BREAKER_THRESHOLD,
+    CIRCUIT_BREAKER_COOLDOWN,
 )
 from .parser import ZSEHDOLiveParser
+from .scheduler import adaptive_interval, instance_offset, next_scheduled_update
+from .store import ZSEHDOScheduleStore
 
 _LOGGER = logging.getLogger(__name__)
 
+# Úlohy spoločného timera
+TIMER_REFRESH = "refresh"
+TIMER_RETRY = "retry"
+TIMER_TARIFF_SWITCH = "tariff_switch"
+
 
 class ZSEHDOCoordinator(DataUpdateCoordinator):
-    """Coordinator pre ZSE HDO dáta."""
+    """Coordinator pre ZSE HDO dáta všetkých nakonfigurovaných HDO čísel."""
 
     def __init__(
         self,
         hass: HomeAssistant,
         parser: ZSEHDOLiveParser,
-        hdo_number: int,
-        update_frequency: str = DEFAULT_UPDATE_FREQUENCY,
+        store: Optional[ZSEHDOScheduleStore] = None,
+        instance_id: Optional[str] = None,
     ):
         """Initialize coordinator."""
         self.parser = parser
-        self.hdo_number = hdo_number
-        self.update_frequency = update_frequency
-        
-        # Získaj konfiguráciu frekvencie
-        frequency_config = UPDATE_FREQUENCIES.get(
-            update_frequency, 
-            UPDATE_FREQUENCIES[DEFAULT_UPDATE_FREQUENCY]
+        self.store = store
+        self.update_frequency = DEFAULT_UPDATE_FREQUENCY
+        self.frequency_type = UPDATE_FREQUENCIES[DEFAULT_UPDATE_FREQUENCY]["type"]
+
+        # Stály posun naplánovaných aktualizácií tejto inštalácie
+        self.update_offset = (
+            instance_offset(instance_id, SCHEDULED_UPDATE_WINDOW) if instance_id else 0
         )
+
+        # entry_id → (HDO číslo, frekvencia)
+        self._entries: Dict[str, tuple] = {}
+
+        # Spoločný timer: úloha → čas (UTC), naplánovaný je len najbližší
+        self._deadlines: Dict[str, datetime] = {}
+        self._timer_at: Optional[datetime] = None
+        self._timer_unsub = None
         
+        # Stale-while-revalidate: posledné úspešné stiahnutie a opakovanie po chybe
+        self.last_fetch: Optional[datetime] = None
+        self.failures = 0
+        self.retry_at: Optional[datetime] = None
+
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=DOMAIN,
+            update_interval=None,
+            # Listenery sa volajú len ak sa dáta skutočne zmenili
+            always_update=False,
+        )
+
+    @property
+    def hdo_numbers(self) -> Set[int]:
+        """Return HDO numbers of all registered config entries."""
+        return {hdo_number for hdo_number, _ in self._entries.values()}
+
+    @callback
+    def async_add_entry(self, entry_id: str, hdo_number: int, update_frequency: str) -> None:
+        """Zaregistruj config entry (HDO číslo a jeho frekvenciu)."""
+        self._entries[entry_id] = (hdo_number, update_frequency)
+        self._async_apply_frequency()
+        self._schedule_tariff_switch()
+
+    @callback
+    def async_remove_entry(self, entry_id: str) -> bool:
+        """
+        Odregistruj config entry.
+
+        Returns:
+            True ak už nezostala žiadna entry (coordinator možno vypnúť)
+        """
+        self._entries.pop(entry_id, None)
+        if self._entries:
+            self._async_apply_frequency()
+            self._schedule_tariff_switch()
+        return not self._entries
+
+    @callback
+    def _async_apply_frequency(self) -> None:
+        """Nastav najčastejšiu frekvenciu spomedzi registrovaných entries."""
+        frequencies = {
+            frequency if frequency in UPDATE_FREQUENCIES else DEFAULT_UPDATE_FREQUENCY
+            for _, frequency in self._entries.values()
+        } or {DEFAULT_UPDATE_FREQUENCY}
+        update_frequency = min(
+            frequencies, key=lambda key: UPDATE_FREQUENCIES[key]["seconds"]
+        )
+
+        if update_frequency == self.update_frequency and (
+            self.update_interval is not None or TIMER_REFRESH in self._deadlines
+        ):
+            return
+
+        frequency_config = UPDATE_FREQUENCIES[update_frequency]
+        self.update_frequency = update_frequency
         self.frequency_type = frequency_config.get("type", "interval")
-        
+
         # Pre interval typy (5min, 1hour) použij klasický update_interval
         if self.frequency_type == "interval":
-            update_interval = timedelta(seconds=frequency_config["seconds"])
+            self._set_deadline(TIMER_REFRESH, None)
+            self.update_interval = timedelta(seconds=frequency_config["seconds"])
             _LOGGER.info(
-                f"Initializing coordinator for HDO {hdo_number} "
-                f"with interval: {frequency_config['label']} "
+                f"Coordinator for {len(self.hdo_numbers)} HDO number(s) "
+                f"uses interval: {frequency_config['label']} "
                 f"({frequency_config['seconds']}s)"
             )
+            if self._listeners:
+                self._schedule_refresh()
         else:
-            # Pre scheduled typy (1day, 1week, 1month) - prvý update hneď, potom scheduled
-            update_interval = timedelta(minutes=5)  # Fallback, ale použijeme custom scheduling
+            # Pre scheduled typy (1day, 1week, 1month) vlastný timer.
+            # Prepínanie tarify rieši _schedule_tariff_switch, polling netreba.
+            self.update_interval = None
+            self._async_unsub_refresh()
             _LOGGER.info(
-                f"Initializing coordinator for HDO {hdo_number} "
-                f"with scheduled updates: {frequency_config['label']}"
+                f"Coordinator for {len(self.hdo_numbers)} HDO number(s) "
+                f"uses scheduled updates: {frequency_config['label']}"
             )
+            self._schedule_next_update()
 
-        super().__init__(
-            hass,
-            _LOGGER,
-            name=f"{DOMAIN}_hdo_{hdo_number}",
-            update_interval=update_interval,
+    @property
+    def next_update(self) -> Optional[datetime]:
+        """Return time of the next scheduled update (None for interval frequencies)."""
+        return self._deadlines.get(TIMER_REFRESH)
+
+    def adaptive_interval(self) -> float:
+        """
+        Interval naplánovaných aktualizácií podľa toho, ako často sa rozvrh mení.
+
+        Returns:
+            Interval v sekundách (pre interval frekvencie zvolená frekvencia)
+        """
+        base = UPDATE_FREQUENCIES[self.update_frequency]["seconds"]
+        if self.frequency_type != "scheduled" or self.store is None:
+            return base
+        return adaptive_interval(
+            base, self.store.changes, self.store.observed_since, dt_util.utcnow()
         )
-        
-        # Pre scheduled typy nastavíme vlastný timer
-        if self.frequency_type == "scheduled":
-            self._schedule_next_update()
 
     def _calculate_next_update(self) -> datetime:
         """Vypočítaj ďalší scheduled update čas."""
         now = dt_util.now()
-        
-        if self.update_frequency == "1day":
-            # Každý deň o 03:00
-            next_update = now.replace(hour=SCHEDULED_UPDATE_HOUR, minute=0, second=0, microsecond=0)
-            if next_update <= now:
-                next_update += timedelta(days=1)
-                
-        elif self.update_frequency == "1week":
-            # Každý pondelok o 03:00
-            next_update = now.replace(hour=SCHEDULED_UPDATE_HOUR, minute=0, second=0, microsecond=0)
-            days_until_monday = (7 - now.weekday()) % 7  # 0 = pondelok
-            if days_until_monday == 0 and next_update <= now:
-                days_until_monday = 7
-            next_update += timedelta(days=days_until_monday)
-            
-        elif self.update_frequency == "1month":
-            # 1. deň mesiaca o 03:00
-            next_update = now.replace(day=1, hour=SCHEDULED_UPDATE_HOUR, minute=0, second=0, microsecond=0)
-            if next_update <= now:
-                # Ďalší mesiac
-                if now.month == 12:
-                    next_update = next_update.replace(year=now.year + 1, month=1)
-                else:
-                    next_update = next_update.replace(month=now.month + 1)
-        else:
-            # Fallback - zajtra o 03:00
-            next_update = now.replace(hour=SCHEDULED_UPDATE_HOUR, minute=0, second=0, microsecond=0)
-            next_update += timedelta(days=1)
-        
-        return next_update
+        after = now
+
+        # Pri stabilnom rozvrhu sa vynechá niekoľko termínov od posledného stiahnutia
+        base = UPDATE_FREQUENCIES[self.update_frequency]["seconds"]
+        interval = self.adaptive_interval()
+        if self.last_fetch is not None and interval > base:
+            after = max(now, dt_util.as_local(self.last_fetch) + timedelta(seconds=interval - base))
+
+        return next_scheduled_update(self.update_frequency, after, self.update_offset)
 
     def _schedule_next_update(self):
         """Naplánuj ďalší scheduled update."""
         if self.frequency_type != "scheduled":
             return
-            
+
         next_update = self._calculate_next_update()
-        
+
         _LOGGER.info(
-            f"HDO {self.hdo_number}: Next scheduled update at {next_update.strftime('%Y-%m-%d %H:%M:%S')}"
+            f"Next scheduled update at {next_update.strftime('%Y-%m-%d %H:%M:%S')} "
+            f"(interval {self.adaptive_interval() / 86400:.1f} days)"
         )
-        
-        async def _scheduled_update(now):
-            """Vykonaj scheduled update."""
-            _LOGGER.info(f"HDO {self.hdo_number}: Running scheduled update")
+        self._set_deadline(TIMER_REFRESH, next_update)
+
+    def _schedule_tariff_switch(self):
+        """Naplánuj aktualizáciu entít na najbližšie prepnutie tarify z registrovaných HDO alebo polnoc."""
+        if not self.data:
+            self._set_deadline(TIMER_TARIFF_SWITCH, None)
+            return
+
+        now = dt_util.now()
+        # O polnoci sa mení dnešný rozvrh (napr. piatok → sobota) aj bez prepnutia tarify
+        next_switch = dt_util.start_of_local_day(now.date() + timedelta(days=1))
+
+        for hdo_number in self.hdo_numbers:
+            schedule = self.data.get(hdo_number)
+            if schedule is None:
+                continue
+
+            candidate = schedule["compiled"].next_change(now)
+            if candidate is not None and candidate < next_switch:
+                next_switch = candidate
+
+        _LOGGER.debug(f"Next tariff switch or midnight at {next_switch.isoformat()}")
+
+        self._set_deadline(TIMER_TARIFF_SWITCH, next_switch)
+
+    @callback
+    def _set_deadline(self, job: str, when: Optional[datetime]) -> None:
+        """Nastav (alebo zruš pri None) čas úlohy a preplánuj spoločný timer."""
+        if when is None:
+            self._deadlines.pop(job, None)
+        else:
+            self._deadlines[job] = dt_util.as_utc(when)
+        self._arm_timer()
+
+    @callback
+    def _arm_timer(self) -> None:
+        """Naplánuj spoločný timer na najbližšiu úlohu."""
+        when = min(self._deadlines.values(), default=None)
+        if when == self._timer_at and (when is None or self._timer_unsub is not None):
+            return
+
+        self._cancel_timer()
+        self._timer_at = when
+        if when is not None:
+            self._timer_unsub = async_track_point_in_utc_time(
+                self.hass, self._async_timer_fired, when
+            )
+
+    @callback
+    def _cancel_timer(self) -> None:
+        """Zruš spoločný timer."""
+        if self._timer_unsub:
+            self._timer_unsub()
+        self._timer_unsub = None
+        self._timer_at = None
+
+    async def _async_timer_fired(self, now: datetime) -> None:
+        """Vykonaj všetky úlohy, ktorých čas nastal."""
+        self._timer_unsub = None
+        self._timer_at = None
+
+        now = max(now, dt_util.utcnow())
+        due = {job for job, when in self._deadlines.items() if when <= now}
+        for job in due:
+            del self._deadlines[job]
+        self._arm_timer()
+
+        if TIMER_TARIFF_SWITCH in due:
+            # Prepni tarifu v entitách - bez sťahovania dát (preplánuje aj ďalšie prepnutie)
+            self.async_update_listeners()
+
+        if TIMER_REFRESH in due:
+            _LOGGER.info("Running scheduled update")
             await self.async_request_refresh()
-            # Naplánuj ďalší update
-            self._schedule_next_update()
+            if TIMER_REFRESH not in self._deadlines:
+                # Úspešné stiahnutie už naplánovalo ďalší termín
+                self._schedule_next_update()
+        elif TIMER_RETRY in due:
+            await self.async_refresh()
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Update all listeners and re-arm the tariff switch timer."""
+        self._schedule_tariff_switch()
         
-        # Zruš starý timer ak existuje
-        if hasattr(self, "_scheduled_update_unsub") and self._scheduled_update_unsub:
-            self._scheduled_update_unsub()
+        metrics = self.parser.metrics
+        if metrics is None:
+            super().async_update_listeners()
+            return
         
-        # Naplánuj nový timer
-        self._scheduled_update_unsub = async_track_point_in_time(
-            self.hass,
-            _scheduled_update,
-            next_update
-        )
+        # Entity zapisujú stav synchrónne - meria sa čas aktualizácie senzorov
+        started = time.perf_counter()
+        super().async_update_listeners()
+        metrics.observe("listeners_ms", (time.perf_counter() - started) * 1000)
+
+    async def async_shutdown(self) -> None:
+        """Cancel scheduled updates, retries and tariff switches."""
+        await super().async_shutdown()
+
+        self._deadlines.clear()
+        self._cancel_timer()
+
+    def get_transitions(
+        self, hdo_number: int, start: datetime, end: Optional[datetime] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Postupne vracia prepnutia tarify HDO čísla z aktuálnych dát.
+
+        Args:
+            hdo_number: HDO kód
+            start: Začiatok horizontu
+            end: Koniec horizontu vrátane (None = bez konca)
+
+        Yields:
+            Dict s 'datetime' a 'to_tariff' ("low" alebo "high")
+        """
+        schedule = (self.data or {}).get(hdo_number)
+        if schedule is None:
+            return
+
+        for switch, to_low in schedule["compiled"].transitions(start, end):
+            yield {"datetime": switch, "to_tariff": "low" if to_low else "high"}
+
+    @property
+    def stale(self) -> bool:
+        """Return True if the last refresh failed and stored schedules are served."""
+        return self.failures > 0
+
+    @property
+    def circuit_state(self) -> str:
+        """Stav circuit breakera: 'closed', 'open' alebo 'half_open'."""
+        if self.failures < CIRCUIT_BREAKER_THRESHOLD:
+            return "closed"
+        if self.retry_at is not None and dt_util.utcnow() < self.retry_at:
+            return "open"
+        return "half_open"
+
+    def data_age(self, now: Optional[datetime] = None) -> Optional[float]:
+        """
+        Vek dát v sekundách od posledného úspešného overenia na webe.
+
+        Pre rozvrhy obnovené zo snapshotu (ešte neoverené) sa počíta od
+        ich sparsovania.
+
+        Args:
+            now: Aktuálny čas (None = teraz)
+
+        Returns:
+            Vek v sekundách alebo None ak nie sú dáta
+        """
+        now = now or dt_util.utcnow()
+        if self.last_fetch is not None:
+            return (now - self.last_fetch).total_seconds()
+
+        schedule = next(iter((self.data or {}).values()), None)
+        if schedule is None:
+            return None
+
+        # 'last_updated' je systémový lokálny čas bez časovej zóny (datetime.now())
+        parsed = dt_util.parse_datetime(schedule["last_updated"])
+        if parsed is None:
+            return None
+        return (now - parsed.astimezone()).total_seconds()
+
+    def _retry_delay(self) -> float:
+        """Odstup ďalšieho pokusu - exponenciálny s rozptylom, po prahu cooldown."""
+        if self.failures >= CIRCUIT_BREAKER_THRESHOLD:
+            delay = CIRCUIT_BREAKER_COOLDOWN
+        else:
+            delay = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** (self.failures - 1))
+        # Rozptyl - inštalácie po výpadku nezačnú sťahovať naraz
+        return random.uniform(delay / 2, delay)
 
-    async def _async_update_data(self) -> Dict:
-        """Fetch data from ZSE."""
+    def _schedule_retry(self) -> None:
+        """Naplánuj opakovanie sťahovania po chybe."""
+        self.retry_at = dt_util.utcnow() + timedelta(seconds=self._retry_delay())
+        self._set_deadline(TIMER_RETRY, self.retry_at)
+
+    def _cancel_retry(self) -> None:
+        """Zruš naplánované opakovanie."""
+        self._set_deadline(TIMER_RETRY, None)
+
+    async def async_revalidate(self) -> None:
+        """Revaliduj dáta obnovené zo snapshotu - pri chybe zostanú platné a sťahovanie sa zopakuje."""
         try:
-            _LOGGER.debug(f"Fetching schedule for HDO {self.hdo_number}")
-            
-            schedule = await self.parser.get_schedule(self.hdo_number)
-            
-            if schedule is None:
-                raise UpdateFailed(
-                    f"HDO {self.hdo_number} not found on ZSE website"
-                )
-            
+            schedules = await self._async_update_data()
+        except UpdateFailed as err:
+            _LOGGER.warning(f"Revalidation failed, keeping stored schedules: {err}")
+            return
+
+        if schedules is not self.data:
+            self.async_set_updated_data(schedules)
+        else:
+            # Rovnaké dáta, ale entity majú ukázať čas overenia (last_fetch)
+            self.async_update_listeners()
+
+    async def _async_update_data(self) -> Dict[int, Dict]:
+        """Fetch data from ZSE, serving stored schedules while ZSE is failing."""
+        if self.data and self.retry_at is not None and dt_util.utcnow() < self.retry_at:
+            # Počas odstupu (a otvoreného circuit breakera) sa web nesťahuje
             _LOGGER.debug(
-                f"Successfully loaded schedule for HDO {self.hdo_number} "
-                f"(rate: {schedule.get('rate_type', 'Unknown')})"
+                f"Serving stored schedules, next attempt at {self.retry_at.isoformat()}"
             )
-            
-            return schedule
-            
-        except Exception as err:
-            _LOGGER.error(
-                f"Error fetching HDO data for {self.hdo_number}: {err}"
+            return self.data
+
+        try:
+            schedules = await self._async_fetch_schedules()
+        except UpdateFailed as err:
+            self.failures += 1
+            if self.parser.metrics is not None:
+                self.parser.metrics.increment("update_errors")
+
+            if not self.data:
+                raise
+
+            self._schedule_retry()
+            _LOGGER.warning(
+                f"{err} - serving stored schedules "
+                f"(failure {self.failures}, circuit {self.circuit_state}, "
+                f"next attempt at {self.retry_at.isoformat()})"
             )
-            raise UpdateFailed(f"Error fetching HDO data: {err}")
+            if self.failures == 1:
+                # Dáta sa nemenia - entity sa aktualizujú kvôli atribútu 'stale'
+                self.async_update_listeners()
+            return self.data
+
+        recovered = self.failures > 0
+        self.failures = 0
+        self.retry_at = None
+        self._cancel_retry()
+        self.last_fetch = dt_util.utcnow()
+        # Interval sa mohol zmeniť (nová zmena rozvrhu) - termín sa počíta od teraz
+        self._schedule_next_update()
+
+        if recovered:
+            _LOGGER.info("ZSE website reachable again")
+            if schedules is self.data:
+                self.async_update_listeners()
+
+        return schedules
+
+    async def _async_fetch_schedules(self) -> Dict[int, Dict]:
+        """Fetch schedules from ZSE or raise UpdateFailed."""
+        try:
+            _LOGGER.debug(f"Fetching schedules for HDO {sorted(self.hdo_numbers)}")
+
+            schedules = await self.parser.get_all_schedules()
+
+            if not schedules:
+                raise UpdateFailed("No HDO schedules found on ZSE website")
+
+            if schedules is self.data:
+                # Rozvrh na webe sa nezmenil - ponechaj pôvodné dáta (bez update entít)
+                _LOGGER.debug("Schedules unchanged")
+                return self.data
+
+            missing = self.hdo_numbers - schedules.keys()
+            if missing:
+                _LOGGER.warning(f"HDO {sorted(missing)} not found on ZSE website")
+
+            _LOGGER.debug(f"Successfully loaded schedules for {len(schedules)} HDO numbers")
+
+            # Ulož nový rozvrh na disk pre rýchly štart po reštarte
+            if self.store is not None:
+                self.store.async_save(self.parser.dump_page())
+
+            return schedules
+
+        except UpdateFailed:
+            raise
+        except Exception as err:
+            raise UpdateFailed(f"Error fetching HDO data: {err}") from err
@@ -0,0 +1,249 @@
+"""
+ZSE HDO Tariff Costs
+====================
+
+Rozdelí spotrebu (napr. 15-minútové odpočty elektromera alebo hodinové
+štatistiky Home Assistanta) na nízku a vysokú tarifu podľa HDO rozvrhu
+a spočíta energiu a cenu po dňoch a mesiacoch.
+
+Každý odpočet pokrýva interval [čas, čas + interval_minutes) a do nízkej
+tarify ide pomerná časť podľa minút nízkej tarify v tomto intervale.
+S NumPy prebehne výpočet v jednom vektorovom prechode, bez neho v čistom
+Pythone.
+
+Author: Miroslav Burdych (@mburdych)
+GitHub: https://github.com/mburdych/ZSED-tarify
+Support: https://buymeacoffee.com/mburdych
+
+License: MIT
+"""
+
+import csv
+import io
+from datetime import date, datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from .schedule import CompiledSchedule, MINUTES_PER_DAY, MINUTES_PER_WEEK, minute_of_week, np
+
+# Predvolená dĺžka intervalu odpočtu (elektromery merajú po 15 minútach)
+DEFAULT_INTERVAL_MINUTES = 15
+
+# Ordinal 1970-01-01 - pre minúty od epochy v lokálnom čase
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def _epoch_minute(when: datetime) -> int:
+    """Minúta od 1970-01-01 00:00 v lokálnom (nástennom) čase."""
+    return (when.toordinal() - _EPOCH_ORDINAL) * MINUTES_PER_DAY + when.hour * 60 + when.minute
+
+
+def _totals(low_kwh: float, high_kwh: float, low_price: float, high_price: float) -> Dict[str, float]:
+    """Zostaví súhrn energie a ceny pre jedno obdobie."""
+    low_cost = low_kwh * low_price
+    high_cost = high_kwh * high_price
+    return {
+        "low_kwh": low_kwh,
+        "high_kwh": high_kwh,
+        "total_kwh": low_kwh + high_kwh,
+        "low_cost": low_cost,
+        "high_cost": high_cost,
+        "total_cost": low_cost + high_cost,
+    }
+
+
+def calculate_costs(
+    compiled: CompiledSchedule,
+    timestamps: Any,
+    consumption: Any,
+    low_price: float,
+    high_price: float,
+    interval_minutes: int = DEFAULT_INTERVAL_MINUTES,
+) -> Dict[str, Any]:
+    """
+    Rozdelí spotrebu na nízku/vysokú tarifu a spočíta cenu.
+
+    Args:
+        compiled: Skompilovaný rozvrh HDO čísla
+        timestamps: Začiatky intervalov (numpy.datetime64 pole alebo
+            iterable datetime; rozhoduje lokálny čas)
+        consumption: Spotreba v kWh za každý interval
+        low_price: Cena za kWh v nízkej tarife
+        high_price: Cena za kWh vo vysokej tarife
+        interval_minutes: Dĺžka jedného intervalu v minútach
+
+    Returns:
+        Dict s 'total', 'daily' (zoznam s 'date') a 'monthly' (zoznam s 'month')
+
+    Raises:
+        ValueError: Ak sa počet časov a hodnôt nezhoduje
+    """
+    if interval_minutes <= 0:
+        raise ValueError("interval_minutes must be positive")
+
+    if np is not None:
+        return _calculate_numpy(
+            compiled, timestamps, consumption, low_price, high_price, interval_minutes
+        )
+    return _calculate_python(
+        compiled, timestamps, consumption, low_price, high_price, interval_minutes
+    )
+
+
+def _calculate_numpy(
+    compiled: CompiledSchedule,
+    timestamps: Any,
+    consumption: Any,
+    low_price: float,
+    high_price: float,
+    interval_minutes: int,
+) -> Dict[str, Any]:
+    """Vektorový výpočet (NumPy)."""
+    values = np.asarray(consumption, dtype=float).ravel()
+    stamps = np.asarray(timestamps)
+    if stamps.dtype == object:
+        stamps = np.fromiter(
+            (_epoch_minute(when) for when in stamps.ravel()), dtype=np.int64, count=stamps.size
+        ).view("datetime64[m]")
+    else:
+        stamps = stamps.ravel().astype("datetime64[m]")
+
+    if stamps.size != values.size:
+        raise ValueError(f"Got {stamps.size} timestamps but {values.size} consumption values")
+
+    # 1970-01-01 bol štvrtok - 3 dni po pondelku
+    minutes = (stamps.astype(np.int64) + 3 * MINUTES_PER_DAY) % MINUTES_PER_WEEK
+    low_share = compiled.low_minutes_many(minutes, interval_minutes) / interval_minutes
+
+    low_kwh = values * low_share
+    high_kwh = values - low_kwh
+
+    def aggregate(keys: "np.ndarray", label: str, fmt: str) -> List[Dict[str, Any]]:
+        """Súčty po obdobiach (dňoch/mesiacoch) cez bincount."""
+        periods, inverse = np.unique(keys, return_inverse=True)
+        low = np.bincount(inverse, weights=low_kwh, minlength=periods.size)
+        high = np.bincount(inverse, weights=high_kwh, minlength=periods.size)
+        return [
+            {label: period.item().strftime(fmt), **_totals(float(low_sum), float(high_sum), low_price, high_price)}
+            for period, low_sum, high_sum in zip(periods, low, high)
+        ]
+
+    return {
+        "total": _totals(float(low_kwh.sum()), float(high_kwh.sum()), low_price, high_price),
+        "daily": aggregate(stamps.astype("datetime64[D]"), "date", "%Y-%m-%d"),
+        "monthly": aggregate(stamps.astype("datetime64[M]"), "month", "%Y-%m"),
+    }
+
+
+def _calculate_python(
+    compiled: CompiledSchedule,
+    timestamps: Iterable[datetime],
+    consumption: Iterable[float],
+    low_price: float,
+    high_price: float,
+    interval_minutes: int,
+) -> Dict[str, Any]:
+    """Výpočet v čistom Pythone (bez NumPy)."""
+    timestamps = list(timestamps)
+    values = [float(value) for value in consumption]
+    if len(timestamps) != len(values):
+        raise ValueError(f"Got {len(timestamps)} timestamps but {len(values)} consumption values")
+
+    daily: Dict[str, List[float]] = {}
+    monthly: Dict[str, List[float]] = {}
+    total_low = total_high = 0.0
+
+    for when, value in zip(timestamps, values):
+        low = value * compiled.low_minutes(minute_of_week(when), interval_minutes) / interval_minutes
+        high = value - low
+        total_low += low
+        total_high += high
+
+        for bucket, key in ((daily, when.strftime("%Y-%m-%d")), (monthly, when.strftime("%Y-%m"))):
+            sums = bucket.setdefault(key, [0.0, 0.0])
+            sums[0] += low
+            sums[1] += high
+
+    return {
+        "total": _totals(total_low, total_high, low_price, high_price),
+        "daily": [
+            {"date": key, **_totals(low, high, low_price, high_price)}
+            for key, (low, high) in sorted(daily.items())
+        ],
+        "monthly": [
+            {"month": key, **_totals(low, high, low_price, high_price)}
+            for key, (low, high) in sorted(monthly.items())
+        ],
+    }
+
+
+def read_consumption_csv(
+    source: Union[str, io.TextIOBase], delimiter: str = ""
+) -> Tuple[List[datetime], List[float]]:
+    """
+    Načíta spotrebu z CSV (prvý stĺpec čas v ISO formáte, druhý kWh).
+
+    Riadky, ktoré sa nedajú prečítať (napr. hlavička), sa preskočia.
+    Desatinná čiarka sa akceptuje.
+
+    Args:
+        source: Text CSV alebo otvorený textový súbor
+        delimiter: Oddeľovač stĺpcov ("" = rozpoznať automaticky z , ; tab)
+
+    Returns:
+        Tuple (časy, hodnoty v kWh)
+    """
+    text = source if isinstance(source, str) else source.read()
+    if not delimiter:
+        try:
+            delimiter = csv.Sniffer().sniff(text[:4096], delimiters=",;\t").delimiter
+        except csv.Error:
+            delimiter = ","
+
+    timestamps: List[datetime] = []
+    values: List[float] = []
+
+    for row in csv.reader(io.StringIO(text), delimiter=delimiter):
+        if len(row) < 2:
+            continue
+        try:
+            when = datetime.fromisoformat(row[0].strip())
+            value = float(row[1].strip().replace(",", "."))
+        except ValueError:
+            continue
+        timestamps.append(when)
+        values.append(value)
+
+    return timestamps, values
+
+
+def consumption_from_statistics(
+    rows: Sequence[Dict[str, Any]], to_local: Optional[Callable[[datetime], datetime]] = None
+) -> Tuple[List[datetime], List[float]]:
+    """
+    Prevedie riadky štatistík Home Assistanta na časy a spotrebu.
+
+    Args:
+        rows: Riadky zo statistics_during_period (s 'start' a 'change')
+        to_local: Funkcia na prevod UTC datetime do lokálneho času
+
+    Returns:
+        Tuple (časy začiatkov, spotreba v kWh)
+    """
+    timestamps: List[datetime] = []
+    values: List[float] = []
+
+    for row in rows:
+        change = row.get("change")
+        if change is None:
+            continue
+
+        start = row["start"]
+        if not isinstance(start, datetime):
+            start = datetime.fromtimestamp(start, tz=timezone.utc)
+        if to_local is not None:
+            start = to_local(start)
+
+        timestamps.append(start)
+        values.append(float(change))
+
+    return timestamps, values
@@ -0,0 +1,81 @@
+"""Diagnostics for ZSE HDO Live integration.
+
+Reports the coordinator state, page and cache statistics and the rolling
+timings of every update stage (network, extraction, normalization,
+index, sensors).
+
+Author: Miroslav Burdych (@mburdych)
+GitHub: https://github.com/mburdych/ZSED-tarify
+Support: https://buymeacoffee.com/mburdych
+
+License: MIT
+"""
+
+from typing import Any, Dict
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> Dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    entry_data = hass.data[DOMAIN][entry.entry_id]
+    coordinator = entry_data["coordinator"]
+    parser = entry_data["parser"]
+    cache = parser.cache
+
+    page = cache.peek(parser.url)
+    schedule = (coordinator.data or {}).get(entry_data["hdo_number"])
+
+    return {
+        "entry": {
+            "hdo_number": entry_data["hdo_number"],
+            "data": dict(entry.data),
+        },
+        "coordinator": {
+            "hdo_numbers": sorted(coordinator.hdo_numbers),
+            "update_frequency": coordinator.update_frequency,
+            "update_offset": coordinator.update_offset,
+            "adaptive_interval": coordinator.adaptive_interval(),
+            "next_update": coordinator.next_update,
+            "schedule_changes": coordinator.store.changes if coordinator.store else None,
+            "last_update_success": coordinator.last_update_success,
+            "last_fetch": coordinator.last_fetch,
+            "data_age": coordinator.data_age(),
+            "failures": coordinator.failures,
+            "circuit": coordinator.circuit_state,
+            "retry_at": coordinator.retry_at,
+            "last_exception": repr(coordinator.last_exception)
+            if coordinator.last_exception
+            else None,
+        },
+        "schedule": {
+            "rate_type": schedule["rate_type"],
+            "category": schedule["category"],
+            **schedule["schedule"].as_dict(),
+        }
+        if schedule
+        else None,
+        "page": {
+            "codes": len(page["codes"]),
+            "content_hash": page["content_hash"],
+            "updated_at": page["updated_at"],
+            "etag": page["etag"],
+            "last_modified": page["last_modified"],
+            "checked_at": page.get("checked_at"),
+        }
+        if page
+        else None,
+        "cache": {
+            "entries": len(cache),
+            "hits": cache.hits,
+            "misses": cache.misses,
+            "coalesced": cache.coalesced,
+        },
+        "parser": dict(parser.stats),
+        "metrics": parser.metrics.as_dict() if parser.metrics is not None else None,
+    }
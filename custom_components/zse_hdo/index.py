@@ -0,0 +1,183 @@
+"""
+ZSE HDO Low Tariff Index
+========================
+
+Invertovaný index nízkej tarify naprieč všetkými HDO kódmi stránky.
+Týždeň je rozdelený na úseky medzi hranicami všetkých rozvrhov a každý
+úsek má bitovú masku kódov s nízkou tarifou (1 bit za kód). Otázka
+"ktoré kódy majú v čase t nízku tarifu" je potom binárne vyhľadanie
+úseku a "kedy majú kódy A a B spolu nízku tarifu" je AND masiek - bez
+prechádzania jednotlivých rozvrhov.
+
+Author: Miroslav Burdych (@mburdych)
+GitHub: https://github.com/mburdych/ZSED-tarify
+Support: https://buymeacoffee.com/mburdych
+
+License: MIT
+"""
+
+from bisect import bisect_right
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+from .schedule import MINUTES_PER_WEEK, CompiledSchedule, minute_of_week
+
+
+class ScheduleIndex:
+    """Index úsek týždňa → HDO kódy s nízkou tarifou."""
+
+    __slots__ = ("codes", "_bits", "_starts", "_masks")
+
+    def __init__(self, schedules: Mapping[int, CompiledSchedule]):
+        """
+        Vytvorí index (raz pre každú stiahnutú stránku).
+
+        Args:
+            schedules: Skompilovaný rozvrh pre každý HDO kód
+        """
+        self.codes: Tuple[int, ...] = tuple(sorted(schedules))
+        self._bits: Dict[int, int] = {
+            code: 1 << position for position, code in enumerate(self.codes)
+        }
+
+        # Kódy s rovnakým rozvrhom sa spracujú spolu - rozvrhov je oveľa menej ako kódov
+        groups: Dict[CompiledSchedule, int] = {}
+        for code in self.codes:
+            compiled = schedules[code]
+            groups[compiled] = groups.get(compiled, 0) | self._bits[code]
+
+        # Na každej hranici rozvrhu sa bity jeho kódov preklopia
+        mask = 0
+        toggles: Dict[int, int] = {}
+        for compiled, group in groups.items():
+            if compiled.is_low(0):
+                mask |= group
+            for boundary in compiled.boundaries:
+                if boundary:
+                    toggles[boundary] = toggles.get(boundary, 0) ^ group
+
+        starts = [0]
+        masks = [mask]
+        for boundary in sorted(toggles):
+            mask ^= toggles[boundary]
+            starts.append(boundary)
+            masks.append(mask)
+
+        self._starts: Tuple[int, ...] = tuple(starts)
+        self._masks: Tuple[int, ...] = tuple(masks)
+
+    def __len__(self) -> int:
+        """Return number of indexed HDO codes."""
+        return len(self.codes)
+
+    def __contains__(self, code: object) -> bool:
+        """Return True if the HDO code is indexed."""
+        return code in self._bits
+
+    def mask(self, codes: Iterable[int]) -> int:
+        """
+        Bitová maska pre skupinu HDO kódov.
+
+        Raises:
+            KeyError: Ak niektorý kód nie je v indexe
+        """
+        mask = 0
+        for code in codes:
+            mask |= self._bits[int(code)]
+        return mask
+
+    def _decode(self, mask: int) -> List[int]:
+        """Prevedie bitovú masku na zoradený zoznam HDO kódov."""
+        codes = []
+        while mask:
+            lowest = mask & -mask
+            codes.append(self.codes[lowest.bit_length() - 1])
+            mask ^= lowest
+        return codes
+
+    def low_codes(self, minute: int) -> List[int]:
+        """
+        HDO kódy s nízkou tarifou v danej minúte týždňa.
+
+        Args:
+            minute: Minúta týždňa (pondelok 00:00 = 0)
+
+        Returns:
+            Zoradený zoznam HDO kódov
+        """
+        segment = bisect_right(self._starts, minute % MINUTES_PER_WEEK) - 1
+        return self._decode(self._masks[segment])
+
+    def low_codes_at(self, when: datetime) -> List[int]:
+        """HDO kódy s nízkou tarifou v čase when."""
+        return self.low_codes(minute_of_week(when))
+
+    def _common_runs(self, required: int) -> List[Tuple[int, int]]:
+        """
+        Týždenné úseky, v ktorých majú všetky kódy z masky nízku tarifu.
+
+        Úsek cez koniec týždňa (nedeľa → pondelok) je jeden s koncom za
+        MINUTES_PER_WEEK.
+        """
+        runs: List[Tuple[int, int]] = []
+        for segment, (start, mask) in enumerate(zip(self._starts, self._masks)):
+            if mask & required != required:
+                continue
+            if segment + 1 < len(self._starts):
+                end = self._starts[segment + 1]
+            else:
+                end = MINUTES_PER_WEEK
+            if runs and runs[-1][1] == start:
+                runs[-1] = (runs[-1][0], end)
+            else:
+                runs.append((start, end))
+
+        if len(runs) > 1 and runs[0][0] == 0 and runs[-1][1] == MINUTES_PER_WEEK:
+            first = runs.pop(0)
+            runs[-1] = (runs[-1][0], MINUTES_PER_WEEK + first[1])
+        return runs
+
+    def common_low(
+        self, codes: Iterable[int], start: datetime, end: Optional[datetime] = None
+    ) -> Iterator[Tuple[datetime, Optional[datetime]]]:
+        """
+        Postupne vracia obdobia, keď majú všetky kódy naraz nízku tarifu.
+
+        Args:
+            codes: HDO kódy (napr. kódy viacerých odberných miest)
+            start: Začiatok horizontu (naive alebo s časovou zónou)
+            end: Koniec horizontu; None = bez konca
+
+        Yields:
+            Tuple (začiatok, koniec) orezaný na horizont; ak je nízka
+            tarifa stále, jediné obdobie (start, end)
+
+        Raises:
+            KeyError: Ak niektorý kód nie je v indexe
+        """
+        runs = self._common_runs(self.mask(codes))
+        if not runs:
+            return
+        if runs == [(0, MINUTES_PER_WEEK)]:
+            yield start, end
+            return
+
+        # Od predchádzajúceho týždňa - úsek cez nedeľu môže zasahovať za start
+        minute = minute_of_week(start)
+        week_start = start.replace(second=0, microsecond=0) - timedelta(
+            minutes=minute, weeks=1
+        )
+
+        while True:
+            for run_start, run_end in runs:
+                period_start = week_start + timedelta(minutes=run_start)
+                if end is not None and period_start >= end:
+                    return
+
+                period_end = week_start + timedelta(minutes=run_end)
+                if period_end > start:
+                    yield (
+                        max(period_start, start),
+                        period_end if end is None else min(period_end, end),
+                    )
+            week_start += timedelta(weeks=1)
@@ -0,0 +1,379 @@
+"""
+ZSE HDO JavaScript Literal Parser
+=================================
+
+Tolerantný parser JavaScript literálov (objekty, polia, stringy, čísla)
+v jednom lineárnom prechode. Zvláda jednoduché úvodzovky, kľúče bez
+úvodzoviek, koncové čiarky a komentáre a vracia priamo Python objekty.
+
+Author: Miroslav Burdych (@mburdych)
+GitHub: https://github.com/mburdych/ZSED-tarify
+Support: https://buymeacoffee.com/mburdych
+
+License: MIT
+"""
+
+import re
+from typing import Any, List, Optional, Tuple
+
+# Jeden token (pred ním whitespace); typ určuje číslo skupiny. Komentáre
+# preskočí _SKIP zvlášť - vnorené opakovanie (?:\s+|komentár)* v tom istom
+# vzore by pri neplatnom tokene exponenciálne backtrackovalo
+_TOKEN = re.compile(
+    r"\s*"
+    r"(?:([\[{])"                                           # 1: otvorenie
+    r"|([\]}])"                                             # 2: zatvorenie
+    r"|(,)"                                                 # 3: čiarka
+    r"|(:)"                                                 # 4: dvojbodka
+    r'|"([^"\\]*(?:\\.[^"\\]*)*)"'                          # 5: "string"
+    r"|'([^'\\]*(?:\\.[^'\\]*)*)'"                          # 6: 'string'
+    r"|([-+]?(?:\d+(?:\.\d*)?|\.\d+)(?:[eE][-+]?\d+)?)"     # 7: číslo
+    r"|([A-Za-z_$][\w$]*))",                                # 8: identifikátor
+    re.DOTALL,
+)
+_SKIP = re.compile(r"(?:\s+|//[^\n]*|/\*.*?\*/)*", re.DOTALL)
+
+# Len štruktúra literálu - stringy a komentáre sa preskočia celé
+_STRUCTURE = re.compile(
+    r'"[^"\\]*(?:\\.[^"\\]*)*"'
+    r"|'[^'\\]*(?:\\.[^'\\]*)*'"
+    r"|//[^\n]*|/\*.*?\*/"
+    r"|[\[\]{}]",
+    re.DOTALL,
+)
+
+# To isté pre text prichádzajúci po častiach: skupina 1 je zátvorka,
+# skupina 2 začiatok stringu/komentára, ktorý v časti ešte nie je uzavretý
+_STRUCTURE_PARTIAL = re.compile(
+    r'"[^"\\]*(?:\\.[^"\\]*)*"'
+    r"|'[^'\\]*(?:\\.[^'\\]*)*'"
+    r"|//[^\n]*\n|/\*.*?\*/"
+    r"|([\[\]{}])"
+    r"|([\"']|//|/\*|/\Z)",
+    re.DOTALL,
+)
+
+# Koniec stringu alebo escape v ňom (pre string, ktorý prechádza cez časti)
+_STRING_END = {'"': re.compile(r'["\\]'), "'": re.compile(r"['\\]")}
+
+_OPEN, _CLOSE, _COMMA, _COLON, _DQ_STRING, _SQ_STRING, _NUMBER, _IDENTIFIER = range(1, 9)
+
+_ESCAPE = re.compile(r"\\(u[0-9a-fA-F]{4}|x[0-9a-fA-F]{2}|\r\n|.)", re.DOTALL)
+_SIMPLE_ESCAPES = {
+    "n": "\n",
+    "t": "\t",
+    "r": "\r",
+    "b": "\b",
+    "f": "\f",
+    "v": "\v",
+    "0": "\0",
+    "\n": "",
+    "\r\n": "",
+}
+
+_KEYWORDS = {
+    "true": True,
+    "false": False,
+    "null": None,
+    "undefined": None,
+}
+
+
+class JSLiteralError(ValueError):
+    """Chyba pri parsovaní JavaScript literálu."""
+
+    def __init__(self, message: str, pos: int):
+        """Initialize error with position in source text."""
+        super().__init__(f"{message} at position {pos}")
+        self.pos = pos
+
+
+def _unescape_match(match: "re.Match[str]") -> str:
+    """Preloží jednu escape sekvenciu."""
+    seq = match.group(1)
+    if len(seq) > 1 and seq[0] in "ux":
+        return chr(int(seq[1:], 16))
+    return _SIMPLE_ESCAPES.get(seq, seq)
+
+
+def _unescape(body: str) -> str:
+    """Preloží escape sekvencie v tele stringu."""
+    if "\\" not in body:
+        return body
+    return _ESCAPE.sub(_unescape_match, body)
+
+
+# Značka "objekt čaká na kľúč"
+_NO_KEY = object()
+
+
+def _scalar(match: "re.Match[str]", kind: int, as_key: bool) -> Any:
+    """Prevedie skalárny token na Python hodnotu (alebo kľúč objektu)."""
+    raw = match.group(kind)
+    if kind == _DQ_STRING or kind == _SQ_STRING:
+        return _unescape(raw)
+    if as_key:
+        return raw
+    if kind == _NUMBER:
+        if "." in raw or "e" in raw or "E" in raw:
+            return float(raw)
+        return int(raw)
+    if raw in _KEYWORDS:
+        return _KEYWORDS[raw]
+    raise JSLiteralError(f"Unexpected identifier {raw!r}", match.start(kind))
+
+
+def parse_js_literal(text: str, pos: int = 0) -> Tuple[Any, int]:
+    """
+    Sparsuje JavaScript literál začínajúci na pozícii pos.
+
+    Args:
+        text: Zdrojový text (napr. celé HTML)
+        pos: Pozícia, kde literál začína (whitespace sa preskočí)
+
+    Returns:
+        Tuple (Python hodnota, pozícia za koncom literálu)
+
+    Raises:
+        JSLiteralError: Ak text nie je platný literál
+    """
+    match = _TOKEN.match
+    skip = _SKIP.match
+
+    stack: List[Any] = []  # otvorené polia/objekty
+    keys: List[Any] = []   # pre objekty kľúč čakajúci na hodnotu
+    expect_comma = False   # posledná bola hodnota - ďalej smie ísť len ',' alebo koniec
+
+    while True:
+        # Bežný prípad (bez komentárov) jedným vzorom
+        token = match(text, pos) or match(text, skip(text, pos).end())
+        if token is None:
+            pos = skip(text, pos).end()
+            if pos >= len(text):
+                raise JSLiteralError("Unexpected end of input", pos)
+            raise JSLiteralError(f"Unexpected character {text[pos]!r}", pos)
+
+        pos = token.end()
+        kind = token.lastindex
+        key = keys[-1] if stack else None
+
+        if kind == _COMMA or kind == _COLON:
+            # Čiarka len za hodnotou - koncová sa toleruje, diera ([1,,2]) nie
+            if kind == _COLON or not expect_comma:
+                raise JSLiteralError("Expected value", token.start(kind))
+            expect_comma = False
+            continue
+
+        if kind == _CLOSE:
+            if not stack:
+                raise JSLiteralError("Unmatched bracket", token.start(kind))
+            if (token.group(kind) == "}") != (key is not None):
+                raise JSLiteralError("Mismatched bracket", token.start(kind))
+            if key is not None and key is not _NO_KEY:
+                raise JSLiteralError("Expected value", token.start(kind))
+            value = stack.pop()
+            keys.pop()
+
+        elif expect_comma:
+            raise JSLiteralError("Expected ','", token.start(kind))
+
+        elif key is _NO_KEY:
+            if kind == _OPEN:
+                raise JSLiteralError("Expected object key", token.start(kind))
+            keys[-1] = _scalar(token, kind, as_key=True)
+            colon = match(text, pos) or match(text, skip(text, pos).end())
+            if colon is None or colon.lastindex != _COLON:
+                raise JSLiteralError("Expected ':'", pos)
+            pos = colon.end()
+            continue
+
+        elif kind == _OPEN:
+            if token.group(kind) == "[":
+                stack.append([])
+                keys.append(None)
+            else:
+                stack.append({})
+                keys.append(_NO_KEY)
+            continue
+
+        else:
+            value = _scalar(token, kind, as_key=False)
+
+        if not stack:
+            return value, pos
+
+        if keys[-1] is None:
+            stack[-1].append(value)
+        else:
+            stack[-1][keys[-1]] = value
+            keys[-1] = _NO_KEY
+        expect_comma = True
+
+
+def find_literal_end(text: str, pos: int = 0) -> int:
+    """
+    Nájde koniec poľa/objektu začínajúceho na pozícii pos bez jeho parsovania.
+
+    Args:
+        text: Zdrojový text
+        pos: Pozícia otváracej zátvorky (whitespace pred ňou sa preskočí)
+
+    Returns:
+        Pozícia za zatváracou zátvorkou
+
+    Raises:
+        JSLiteralError: Ak literál nezačína '[' / '{' alebo nie je uzavretý
+    """
+    pos = _SKIP.match(text, pos).end()
+    if text[pos:pos + 1] not in ("[", "{"):
+        raise JSLiteralError("Expected '[' or '{'", pos)
+
+    depth = 0
+    for match in _STRUCTURE.finditer(text, pos):
+        char = match.group()
+        if char == "[" or char == "{":
+            depth += 1
+        elif char == "]" or char == "}":
+            depth -= 1
+            if depth == 0:
+                return match.end()
+
+    raise JSLiteralError("Unterminated literal", pos)
+
+
+class LiteralScanner:
+    """
+    Inkrementálne hľadanie konca poľa/objektu v texte prichádzajúcom po častiach.
+
+    Rovnaký princíp ako find_literal_end, ale stav lexera (hĺbka, otvorený
+    string/komentár, escape alebo '/' na konci časti) sa prenáša medzi
+    volaniami feed, takže každý znak sa prehľadá len raz.
+    """
+
+    def __init__(self):
+        """Initialize scanner - prvý znak literálu musí byť '[' alebo '{'."""
+        self._parts: List[str] = []
+        self._depth = 0
+        # None = štruktúra, '"' / "'" = string, '//' / '/*' = komentár,
+        # '/' = lomka na konci časti (komentár alebo nie rozhodne ďalší znak)
+        self._mode: Optional[str] = None
+        self._escape = False  # string: časť skončila spätnou lomkou
+        self._star = False    # blokový komentár: časť skončila '*'
+        self.closed = False
+
+    @property
+    def literal(self) -> str:
+        """Return text of the literal read so far (celý ak closed)."""
+        return "".join(self._parts)
+
+    def _resume(self, text: str, pos: int) -> Optional[int]:
+        """
+        Dočíta otvorený string/komentár.
+
+        Args:
+            text: Aktuálna časť
+            pos: Pozícia, od ktorej pokračuje otvorený string/komentár
+
+        Returns:
+            Pozícia za jeho koncom, alebo None ak pokračuje v ďalšej časti
+        """
+        mode = self._mode
+        end = len(text)
+
+        if mode == "/":
+            if pos == end:
+                return None
+            if text[pos] != "/" and text[pos] != "*":
+                self._mode = None
+                return pos
+            mode = self._mode = "/" + text[pos]
+            pos += 1
+
+        if mode == "//":
+            found = text.find("\n", pos)
+            if found < 0:
+                return None
+            self._mode = None
+            return found + 1
+
+        if mode == "/*":
+            if self._star:
+                self._star = False
+                if text.startswith("/", pos):
+                    self._mode = None
+                    return pos + 1
+            found = text.find("*/", pos)
+            if found < 0:
+                self._star = end > pos and text[-1] == "*"
+                return None
+            self._mode = None
+            return found + 2
+
+        if self._escape:
+            self._escape = False
+            pos += 1
+        search = _STRING_END[mode].search
+        while True:
+            match = search(text, pos)
+            if match is None:
+                return None
+            pos = match.end()
+            if match.group() == mode:
+                self._mode = None
+                return pos
+            if pos == end:
+                self._escape = True
+                return None
+            pos += 1
+
+    def feed(self, text: str) -> Optional[str]:
+        """
+        Spracuje ďalšiu časť textu.
+
+        Args:
+            text: Pokračovanie literálu
+
+        Returns:
+            Text za koncom literálu ak sa práve uzavrel, inak None
+
+        Raises:
+            JSLiteralError: Ak literál nezačína '[' / '{'
+        """
+        if self.closed:
+            return text
+        if not text:
+            return None
+
+        if not self._parts and text[0] not in ("[", "{"):
+            raise JSLiteralError("Expected '[' or '{'", 0)
+
+        pos: Optional[int] = 0
+        if self._mode is not None:
+            pos = self._resume(text, 0)
+
+        while pos is not None:
+            for match in _STRUCTURE_PARTIAL.finditer(text, pos):
+                start = match.group(2)
+                if start is not None:
+                    # String/komentár pokračuje ďalej - dočíta sa bez regexu
+                    # pre celý token, prípadne až v ďalšej časti
+                    self._mode = start
+                    pos = self._resume(text, match.end())
+                    break
+
+                char = match.group(1)
+                if char is None:
+                    continue
+                if char == "[" or char == "{":
+                    self._depth += 1
+                else:
+                    self._depth -= 1
+                    if self._depth == 0:
+                        self._parts.append(text[:match.end()])
+                        self.closed = True
+                        return text[match.end():]
+            else:
+                break
+
+        self._parts.append(text)
+        return None
@@ -0,0 +1,121 @@
+"""
+ZSE HDO Metrics
+===============
+
+Ľahká inštrumentácia sťahovania a parsovania - klzavé histogramy
+(posledných N hodnôt) a počítadlá. Parser meria len ak dostane objekt
+ZSEHDOMetrics, bez neho je réžia nulová.
+
+Author: Miroslav Burdych (@mburdych)
+GitHub: https://github.com/mburdych/ZSED-tarify
+Support: https://buymeacoffee.com/mburdych
+
+License: MIT
+"""
+
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+# Počet posledných hodnôt v histograme
+METRICS_WINDOW = 100
+
+
+class RollingHistogram:
+    """Histogram posledných N hodnôt s celkovým počtom pozorovaní."""
+
+    __slots__ = ("_values", "count", "total")
+
+    def __init__(self, window: int = METRICS_WINDOW):
+        """
+        Initialize histogram.
+
+        Args:
+            window: Počet posledných hodnôt, z ktorých sa počíta súhrn
+        """
+        self._values: Deque[float] = deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value: float) -> None:
+        """Pridá hodnotu."""
+        self._values.append(value)
+        self.count += 1
+        self.total += value
+
+    @property
+    def last(self) -> Optional[float]:
+        """Posledná hodnota alebo None."""
+        return self._values[-1] if self._values else None
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Súhrn hodnôt v okne.
+
+        Returns:
+            Dict s 'count' (celkovo), 'last', 'mean', 'p50', 'p95' a 'max'
+            (z posledných hodnôt, zaokrúhlené)
+        """
+        if not self._values:
+            return {"count": self.count}
+
+        ordered = sorted(self._values)
+        return {
+            "count": self.count,
+            "last": round(self._values[-1], 3),
+            "mean": round(sum(ordered) / len(ordered), 3),
+            "p50": round(ordered[(len(ordered) - 1) // 2], 3),
+            "p95": round(ordered[int(0.95 * (len(ordered) - 1))], 3),
+            "max": round(ordered[-1], 3),
+        }
+
+
+class ZSEHDOMetrics:
+    """Klzavé histogramy a počítadlá pre jednotlivé fázy aktualizácie."""
+
+    def __init__(self, window: int = METRICS_WINDOW):
+        """
+        Initialize metrics.
+
+        Args:
+            window: Veľkosť okna histogramov
+        """
+        self.window = window
+        self.histograms: Dict[str, RollingHistogram] = {}
+        self.counters: Dict[str, int] = {}
+
+    def observe(self, name: str, value: float) -> None:
+        """
+        Zaznamená hodnotu do histogramu (vytvorí ho pri prvom použití).
+
+        Args:
+            name: Názov metriky (napr. 'fetch_ms')
+            value: Nameraná hodnota
+        """
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = RollingHistogram(self.window)
+        histogram.observe(value)
+
+    def increment(self, name: str, amount: int = 1) -> None:
+        """Zvýši počítadlo."""
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def last(self, name: str) -> Optional[float]:
+        """Posledná hodnota histogramu alebo None."""
+        histogram = self.histograms.get(name)
+        return histogram.last if histogram is not None else None
+
+    def as_dict(self) -> Dict[str, Any]:
+        """
+        Vráti všetky metriky (napr. pre diagnostiku).
+
+        Returns:
+            Dict s 'counters' a 'histograms' (súhrny podľa názvu)
+        """
+        return {
+            "counters": dict(sorted(self.counters.items())),
+            "histograms": {
+                name: histogram.summary()
+                for name, histogram in sorted(self.histograms.items())
+            },
+        }
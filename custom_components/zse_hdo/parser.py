@@ -12,14 +12,27 @@ License: MIT
 """
 
 import re
-import json
+import asyncio
+import codecs
+import hashlib
 import logging
-from typing import Dict, List, Optional
-from datetime import datetime, time
+import queue
+import threading
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+from datetime import datetime
 
 import aiohttp
 import async_timeout
 
+from .cache import ZSEHDOPageCache
+from .catalog import HDOCatalog
+from .index import ScheduleIndex
+from .jsliteral import JSLiteralError, find_literal_end, parse_js_literal
+from .metrics import ZSEHDOMetrics
+from .schedule import CompiledSchedule, Period, Schedule, format_minutes, parse_minutes
+from .stream import RateTableStream
+
 _LOGGER = logging.getLogger(__name__)
 
 # URL pre HDO dáta
@@ -28,20 +41,65 @@ ZSE_HDO_URL = "https://www.zsdis.sk/Uvod/Online-sluzby/Casy-prepinania-nizkej-a-
 # Timeout pre HTTP požiadavky
 REQUEST_TIMEOUT = 30
 
+# JavaScript premenné s HDO tabuľkami
+RATE_VARIABLES = ("household_rates", "business_rates")
+
+# Veľkosť čítaného bloku pri streamovaní odpovede
+STREAM_CHUNK_SIZE = 16384
+
+# Katalóg kódov z cache staršieho obsahu sa pred použitím revaliduje
+CATALOG_MAX_AGE = 86400  # seconds
+
 
 class ZSEHDOLiveParser:
     """Parser pre live ZSE HDO dáta z webu."""
 
-    def __init__(self, session: Optional[aiohttp.ClientSession] = None):
+    def __init__(
+        self,
+        session: Optional[aiohttp.ClientSession] = None,
+        cache: Optional[ZSEHDOPageCache] = None,
+        executor: Optional[Callable[..., Awaitable[Any]]] = None,
+        metrics: Optional[ZSEHDOMetrics] = None,
+        url: str = ZSE_HDO_URL,
+    ):
         """
         Initialize parser.
         
         Args:
             session: Aiohttp session (ak None, vytvorí sa nová)
+            cache: Zdieľaná cache stránky (ak None, vytvorí sa vlastná)
+            executor: Spúšťač blokujúcej práce (napr. hass.async_add_executor_job);
+                ak None, použije sa default executor event loopu
+            metrics: Kam zapisovať časy a počítadlá (ak None, nemeria sa)
+            url: Adresa stránky s HDO tabuľkami (napr. lokálny server v benchmarkoch);
+                je aj kľúčom stránky v cache
         """
+        self._url = url
         self._session = session
         self._own_session = session is None
+        self._cache = cache if cache is not None else ZSEHDOPageCache()
+        self._executor = executor
+        self.metrics = metrics
+        
+        # Trvanie posledného parsovania a hľadania tabuliek v streame
+        # (stream_time, oboje v executore) a blokovania event loopu
+        self.stats: Dict[str, Any] = {
+            "parse_count": 0,
+            "parse_time": None,
+            "loop_time": None,
+            "stream_time": None,
+        }
         
+    @property
+    def url(self) -> str:
+        """Return the URL of the HDO page."""
+        return self._url
+    
+    @property
+    def cache(self) -> ZSEHDOPageCache:
+        """Return the page cache (shared when passed in)."""
+        return self._cache
+    
     async def __aenter__(self):
         """Async context manager entry."""
         if self._own_session:
@@ -57,9 +115,37 @@ class ZSEHDOLiveParser:
         """
         Stiahne HTML stránku zo ZSE webu.
         
+        Súbežné volania zdieľajú jednu HTTP požiadavku.
+        
         Returns:
             HTML content as string
             
+        Raises:
+            aiohttp.ClientError: Ak zlyhá sťahovanie
+        """
+        html, _ = await self._cache.async_single_flight(
+            f"fetch:{self._url}", self._async_fetch_page
+        )
+        return html
+    
+    async def _async_fetch_page(
+        self,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+        extract: bool = False,
+    ) -> Tuple[Optional[str], Dict[str, Optional[str]]]:
+        """
+        Vykoná samotné HTTP stiahnutie stránky (voliteľne podmienené).
+        
+        Args:
+            etag: ETag z predchádzajúcej odpovede (If-None-Match)
+            last_modified: Last-Modified z predchádzajúcej odpovede
+            extract: Čítať stream len po uzavretie HDO tabuliek a vrátiť
+                iba ich (viď _async_read_rate_tables) namiesto celého HTML
+            
+        Returns:
+            Tuple (HTML alebo None ak server vrátil 304, validátory odpovede)
+            
         Raises:
             aiohttp.ClientError: Ak zlyhá sťahovanie
         """
@@ -67,205 +153,491 @@ class ZSEHDOLiveParser:
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
             "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
             "Accept-Language": "sk,en;q=0.5",
+            "Accept-Encoding": "gzip, deflate",
         }
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
         
-        _LOGGER.debug(f"Fetching HDO data from {ZSE_HDO_URL}")
+        _LOGGER.debug(f"Fetching HDO data from {self._url}")
         
         if not self._session:
             self._session = aiohttp.ClientSession()
             self._own_session = True
         
+        started = time.perf_counter()
+        
         try:
             async with async_timeout.timeout(REQUEST_TIMEOUT):
-                async with self._session.get(ZSE_HDO_URL, headers=headers) as response:
+                async with self._session.get(self._url, headers=headers) as response:
+                    if response.status == 304:
+                        _LOGGER.debug("HDO page not modified (304)")
+                        if self.metrics is not None:
+                            self.metrics.increment("not_modified")
+                            self.metrics.observe("fetch_ms", (time.perf_counter() - started) * 1000)
+                        return None, {"etag": etag, "last_modified": last_modified}
+                    
                     response.raise_for_status()
-                    html = await response.text()
+                    validators = {
+                        "etag": response.headers.get("ETag"),
+                        "last_modified": response.headers.get("Last-Modified"),
+                    }
+                    
+                    if extract:
+                        html = await self._async_read_rate_tables(response)
+                    else:
+                        html = await response.text()
                     _LOGGER.debug(f"Successfully fetched {len(html)} bytes")
-                    return html
+                    
+                    if self.metrics is not None:
+                        self.metrics.increment("fetches")
+                        self.metrics.observe("fetch_ms", (time.perf_counter() - started) * 1000)
+                        self.metrics.observe("bytes_received", response.content.total_bytes)
+                    return html, validators
         except aiohttp.ClientError as err:
             _LOGGER.error(f"Failed to fetch HDO data: {err}")
+            if self.metrics is not None:
+                self.metrics.increment("fetch_errors")
             raise
         except Exception as err:
             _LOGGER.error(f"Unexpected error fetching HDO data: {err}")
+            if self.metrics is not None:
+                self.metrics.increment("fetch_errors")
             raise
     
-    def _extract_javascript_array(self, html: str, var_name: str) -> List[Dict]:
+    async def _async_read_rate_tables(self, response: aiohttp.ClientResponse) -> str:
         """
-        Extrahuje JavaScript array z HTML (napr. var household_rates = [...];)
+        Číta odpoveď po častiach a ponechá z nej len HDO tabuľky.
+        
+        Dekódovanie a hľadanie tabuliek beží v jednej úlohe v executore
+        (viď _scan_rate_tables), event loop len odovzdáva prijaté časti.
+        Po uzavretí oboch polí sa čítanie ukončí (zvyšok stránky sa nesťahuje).
         
         Args:
-            html: HTML content
-            var_name: Názov JavaScript premennej (napr. "household_rates")
+            response: Otvorená HTTP odpoveď
             
         Returns:
-            List of dictionaries parsed from JavaScript
+            Minimálny dokument s deklaráciami household_rates/business_rates
         """
-        # Pattern pre nájdenie JavaScript array
-        # Stratégia: Nájdi "var variable_name = [", potom spočítaj zátvorky
-        pattern = rf"var\s+{var_name}\s*=\s*\["
+        chunks: "queue.SimpleQueue[Optional[bytes]]" = queue.SimpleQueue()
+        complete = threading.Event()
+        scan = asyncio.ensure_future(
+            self._async_add_executor_job(
+                self._scan_rate_tables, chunks, complete, response.charset
+            )
+        )
         
-        match = re.search(pattern, html)
-        if not match:
-            _LOGGER.warning(f"JavaScript variable '{var_name}' not found in HTML")
-            return []
+        try:
+            async for chunk in response.content.iter_chunked(STREAM_CHUNK_SIZE):
+                # Tabuľky sú kompletné (alebo hľadanie zlyhalo) - ďalej nečítať
+                if complete.is_set() or scan.done():
+                    break
+                chunks.put(chunk)
+        except BaseException:
+            scan.cancel()
+            raise
+        finally:
+            # Koniec vstupu (aj pri chybe/zrušení) - úloha v executore skončí
+            chunks.put(None)
         
-        # Začiatok array
-        start_pos = match.end() - 1  # Pozícia prvej '['
+        html, stream_time = await scan
         
-        # Nájdi koniec array spočítaním zátvoriek (ale ignoruj zátvorky v stringoch)
-        bracket_count = 0
-        in_string = False
-        string_char = None
-        escaped = False
-        end_pos = start_pos
+        self.stats["stream_time"] = stream_time
+        if self.metrics is not None:
+            self.metrics.observe("stream_ms", stream_time * 1000)
+        return html
+    
+    @staticmethod
+    def _scan_rate_tables(
+        chunks: "queue.SimpleQueue[Optional[bytes]]",
+        complete: threading.Event,
+        charset: Optional[str],
+    ) -> Tuple[str, float]:
+        """
+        Vyberie HDO tabuľky z prichádzajúcich častí odpovede (v executore).
         
-        for i in range(start_pos, len(html)):
-            char = html[i]
-            
-            # Handle escape sequences
-            if escaped:
-                escaped = False
-                continue
+        Args:
+            chunks: Časti odpovede, None znamená koniec
+            complete: Nastaví sa po uzavretí všetkých polí (čítanie môže skončiť)
+            charset: Kódovanie odpovede (None = UTF-8)
             
-            if char == '\\':
-                escaped = True
-                continue
+        Returns:
+            Tuple (minimálny dokument s poľami, čas dekódovania a hľadania v s)
+        """
+        try:
+            decoder = codecs.getincrementaldecoder(charset or "utf-8")(errors="replace")
+        except LookupError:
+            decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        
+        stream = RateTableStream(RATE_VARIABLES)
+        scan_time = 0.0
+        
+        while True:
+            chunk = chunks.get()
+            started = time.perf_counter()
+            if chunk is None:
+                stream.feed(decoder.decode(b"", final=True))
+                scan_time += time.perf_counter() - started
+                break
+            if stream.feed(decoder.decode(chunk)):
+                complete.set()
+                scan_time += time.perf_counter() - started
+                _LOGGER.debug(
+                    f"Rate tables complete after {stream.received} characters, "
+                    "skipping rest of the page"
+                )
+                break
+            scan_time += time.perf_counter() - started
+        
+        started = time.perf_counter()
+        html = stream.to_html()
+        return html, scan_time + time.perf_counter() - started
+    
+    async def _get_page(self) -> Dict[str, Any]:
+        """
+        Vráti sparsovanú stránku s indexom HDO kódov, z cache ak je čerstvá.
+        
+        Returns:
+            Dict s kľúčmi 'index', 'codes' a metadátami stránky
+        """
+        page = self._cache.get(self._url)
+        if page is not None:
+            _LOGGER.debug("Using cached HDO page")
+            return page
+        
+        # Súbežní volajúci (get_schedule, get_all_schedules, ...) čakajú
+        # na jedno spoločné stiahnutie a parsovanie
+        return await self._cache.async_single_flight(
+            f"page:{self._url}", self._async_load_page
+        )
+    
+    async def _async_load_page(self) -> Dict[str, Any]:
+        """
+        Stiahne a sparsuje stránku a uloží výsledok do cache.
+        
+        Returns:
+            Dict s kľúčmi 'index', 'codes' a metadátami stránky
+        """
+        # Predchádzajúca (aj expirovaná) stránka slúži na podmienený GET
+        previous = self._cache.peek(self._url)
+        self.stats["stream_time"] = 0.0
+        
+        if previous is not None:
+            html, validators = await self._async_fetch_page(
+                previous["etag"], previous["last_modified"], extract=True
+            )
+        else:
+            html, validators = await self._async_fetch_page(extract=True)
+        
+        # Kedy bol obsah naposledy overený na webe (čerstvosť katalógu kódov)
+        validators["checked_at"] = time.time()
+        
+        # Čas, počas ktorého parsovanie blokuje event loop (bez čakania na executor)
+        loop_started = time.perf_counter()
+        
+        if html is None:
+            # 304 Not Modified - netreba sťahovať ani parsovať
+            previous.update(validators)
+            self._cache.set(self._url, previous)
+            return previous
+        
+        # Hľadanie tabuliek, hash a parsovanie bežia mimo event loopu
+        previous_hash = previous["content_hash"] if previous is not None else None
+        loop_time = time.perf_counter() - loop_started
+        page = await self._async_add_executor_job(self._parse_page, html, previous_hash)
+        loop_started = time.perf_counter()
+        
+        if page is None:
+            # Tabuľky sa nezmenili - ponechaj pôvodný sparsovaný page
+            _LOGGER.debug("HDO rate tables unchanged, skipping parse")
+            if self.metrics is not None:
+                self.metrics.increment("unchanged")
+            previous.update(validators)
+            self._cache.set(self._url, previous)
+            return previous
+        
+        page.update(validators)
+        
+        # Prázdny výsledok necacheujeme - pravdepodobne zmenená štruktúra stránky
+        if page["index"]:
+            self._cache.set(self._url, page)
+        
+        loop_time += time.perf_counter() - loop_started
+        self.stats["parse_count"] += 1
+        self.stats["parse_time"] = page["parse_time"]
+        self.stats["loop_time"] = loop_time
+        if self.metrics is not None:
+            self.metrics.increment("parses")
+            self.metrics.observe("parse_ms", page["parse_time"] * 1000)
+            self.metrics.observe("loop_ms", loop_time * 1000)
+            for stage, seconds in page["timings"].items():
+                self.metrics.observe(f"{stage}_ms", seconds * 1000)
+            if not page["index"]:
+                self.metrics.increment("empty_pages")
+        _LOGGER.debug(
+            f"Parsed HDO page in {page['parse_time'] * 1000:.1f} ms "
+            f"(stream scan {self.stats['stream_time'] * 1000:.1f} ms, "
+            f"event loop blocked {loop_time * 1000:.1f} ms)"
+        )
+        
+        return page
+    
+    async def _async_add_executor_job(self, func: Callable[..., Any], *args: Any) -> Any:
+        """
+        Spustí blokujúcu funkciu v executore.
+        
+        Args:
+            func: Funkcia na spustenie
+            *args: Argumenty funkcie
             
-            # Handle string boundaries
-            if char in ['"', "'"]:
-                if not in_string:
-                    in_string = True
-                    string_char = char
-                elif char == string_char:
-                    in_string = False
-                    string_char = None
-                continue
+        Returns:
+            Výsledok funkcie
+        """
+        if self._executor is not None:
+            return await self._executor(func, *args)
+        return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+    
+    def _parse_page(self, html: str, previous_hash: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Sparsuje HTML na page s indexom a skompilovanými rozvrhmi.
+        
+        Blokujúca funkcia - volá sa v executore. Pracuje len s novými
+        objektmi, zdieľanú cache nemení.
+        
+        Args:
+            html: HTML content
+            previous_hash: Hash tabuliek predchádzajúcej stránky
             
-            # Count brackets only outside strings
-            if not in_string:
-                if char == '[':
-                    bracket_count += 1
-                elif char == ']':
-                    bracket_count -= 1
-                    if bracket_count == 0:
-                        end_pos = i + 1
-                        break
-        
-        if bracket_count != 0:
-            _LOGGER.error(f"Unmatched brackets in '{var_name}'")
-            return []
+        Returns:
+            Nový page alebo None ak sa tabuľky od previous_hash nezmenili
+        """
+        started = time.perf_counter()
+        
+        regions = self._find_rate_regions(html)
+        content_hash = hashlib.sha256(
+            "\0".join(html[start:end] for start, end in regions.values()).encode()
+        ).hexdigest()
         
-        # Extrahuj array
-        js_array = html[start_pos:end_pos]
+        if content_hash == previous_hash:
+            return None
+        
+        # Časy jednotlivých fáz (sekundy) pre metriky
+        timings = {"scan": time.perf_counter() - started}
+        
+        stage_started = time.perf_counter()
+        household = self._parse_region(html, regions, "household_rates")
+        business = self._parse_region(html, regions, "business_rates")
+        timings["extract"] = time.perf_counter() - stage_started
         
-        # Konvertovať JavaScript objekt na JSON
-        result = js_array
+        stage_started = time.perf_counter()
+        
+        page = {
+            "index": self._build_index(household, business),
+            "content_hash": content_hash,
+            "updated_at": datetime.now().isoformat(),
+            "etag": None,
+            "last_modified": None,
+        }
+        page["codes"] = sorted(page["index"])
         
-        # 1. Replace single quotes with double quotes
-        result = result.replace("'", '"')
+        # Rozvrhy a index naprieč kódmi sa vytvoria tu, aby ich event loop
+        # už nepočítal (raw tabuľky sa tým uvoľnia - page drží len kompaktné rozvrhy)
+        self._all_schedules_from_page(page)
+        timings["normalize"] = time.perf_counter() - stage_started
+        
+        stage_started = time.perf_counter()
+        self._page_index(page)
+        timings["index"] = time.perf_counter() - stage_started
+        
+        page["timings"] = timings
+        page["parse_time"] = time.perf_counter() - started
+        return page
+    
+    def _find_rate_regions(self, html: str) -> Dict[str, Tuple[int, int]]:
+        """
+        Nájde pozície polí household_rates/business_rates v HTML bez parsovania.
+        
+        Args:
+            html: HTML content
+            
+        Returns:
+            Dict názov premennej → (start, end) pozície literálu
+        """
+        regions = {}
         
-        # 2. Quote unquoted object keys (but preserve already quoted)
-        result = re.sub(r'(?<!")(\b\w+)(?=\s*:)', r'"\1"', result)
+        for var_name in RATE_VARIABLES:
+            match = re.search(rf"var\s+{var_name}\s*=\s*(?=\[)", html)
+            if not match:
+                _LOGGER.warning(f"JavaScript variable '{var_name}' not found in HTML")
+                continue
+            
+            try:
+                regions[var_name] = (match.end(), find_literal_end(html, match.end()))
+            except JSLiteralError as err:
+                _LOGGER.error(f"Unmatched brackets in '{var_name}': {err}")
         
-        # 3. Fix boolean values
-        result = result.replace('true', 'true')
-        result = result.replace('false', 'false')
+        return regions
+    
+    def _parse_region(
+        self, html: str, regions: Dict[str, Tuple[int, int]], var_name: str
+    ) -> List[Dict]:
+        """
+        Sparsuje JavaScript array na pozícii nájdenej cez _find_rate_regions.
         
-        # 4. Remove trailing commas before } or ]
-        result = re.sub(r',(\s*[}\]])', r'\1', result)
+        Args:
+            html: HTML content
+            regions: Výsledok _find_rate_regions
+            var_name: Názov JavaScript premennej
+            
+        Returns:
+            List of dictionaries parsed from JavaScript
+        """
+        if var_name not in regions:
+            return []
         
         try:
-            data = json.loads(result)
-            _LOGGER.debug(f"Successfully parsed {len(data)} items from '{var_name}'")
-            return data
-        except json.JSONDecodeError as err:
+            data, _ = parse_js_literal(html, regions[var_name][0])
+        except JSLiteralError as err:
             _LOGGER.error(f"Failed to parse JavaScript array '{var_name}': {err}")
             return []
+        
+        _LOGGER.debug(f"Successfully parsed {len(data)} items from '{var_name}'")
+        return data
+    
+    def _build_index(
+        self, household: List[Dict], business: List[Dict]
+    ) -> Dict[int, Dict[str, Any]]:
+        """
+        Vytvorí index HDO kód → rate (jeden prechod cez obe tabuľky).
+        
+        Args:
+            household: Sparsované household_rates
+            business: Sparsované business_rates
+            
+        Returns:
+            Dict s int kódom ako kľúčom a 'category', 'rate_type', 'rate'
+        """
+        index = {}
+        
+        for category, rates in (("household", household), ("business", business)):
+            for rate in rates:
+                try:
+                    # JSON môže mať kód ako string
+                    code = int(rate["code"])
+                except (KeyError, TypeError, ValueError):
+                    _LOGGER.debug(f"Skipping {category} rate without valid code: {rate!r}")
+                    continue
+                
+                if code in index:
+                    continue  # Prvý výskyt vyhráva (household pred business)
+                
+                # Získaj rate_type z prvého intervalu (všetky majú rovnaký)
+                intervals = rate.get("intervals") or []
+                rate_type = intervals[0].get("for_rate", "Unknown") if intervals else "Unknown"
+                
+                index[code] = {
+                    "category": category,
+                    "rate_type": rate_type,
+                    "rate": rate,
+                }
+        
+        return index
     
-    def _parse_time(self, time_str: str) -> time:
+    def _extract_javascript_array(self, html: str, var_name: str) -> List[Dict]:
         """
-        Konvertuje string času na datetime.time objekt.
+        Extrahuje JavaScript array z HTML (napr. var household_rates = [...];)
         
         Args:
-            time_str: Čas vo formáte "HH:MM" alebo "H:MM"
+            html: HTML content
+            var_name: Názov JavaScript premennej (napr. "household_rates")
             
         Returns:
-            datetime.time object
+            List of dictionaries parsed from JavaScript
         """
-        hour, minute = map(int, time_str.split(':'))
-        return time(hour=hour, minute=minute)
+        # Nájdi "var variable_name = [", literál potom sparsuj v jednom prechode
+        pattern = rf"var\s+{var_name}\s*=\s*(?=\[)"
+        
+        match = re.search(pattern, html)
+        if not match:
+            _LOGGER.warning(f"JavaScript variable '{var_name}' not found in HTML")
+            return []
+        
+        try:
+            data, _ = parse_js_literal(html, match.end())
+        except JSLiteralError as err:
+            _LOGGER.error(f"Failed to parse JavaScript array '{var_name}': {err}")
+            return []
+        
+        _LOGGER.debug(f"Successfully parsed {len(data)} items from '{var_name}'")
+        return data
     
-    def _normalize_schedule(self, intervals: List[Dict]) -> Dict[str, List[Dict]]:
+    def _normalize_schedule(self, intervals: List[Dict]) -> Schedule:
         """
-        Normalizuje rozvrh do formátu použiteľného v HA.
+        Normalizuje rozvrh do kompaktného modelu použiteľného v HA.
+        
+        Rovnaké periódy sa zdieľajú (aj medzi pracovným dňom a víkendom
+        a medzi HDO kódmi), pôvodný tvar vráti Schedule.as_dict().
         
         Args:
             intervals: Raw intervals zo ZSE
             
         Returns:
-            Dict with 'workday' and 'weekend' keys
+            Schedule s periódami pre pracovné dni a víkend
         """
-        schedule = {
-            "workday": [],
-            "weekend": []
-        }
+        workday = []
+        weekend = []
         
         for interval in intervals:
             if interval.get("t_type") != "nt":
                 continue  # Preskočiť vysokú tarifu
             
-            period = {
-                "start": interval["t_from"],
-                "end": interval["t_to"],
-                "tariff": "low",
-                "meaning": interval.get("meaning", ""),
-                "for_rate": interval.get("for_rate", "")
-            }
+            period = Period.create(
+                parse_minutes(interval["t_from"]),
+                parse_minutes(interval["t_to"]),
+                interval.get("meaning") or "",
+                interval.get("for_rate") or "",
+            )
             
             if interval.get("weekday"):
-                schedule["workday"].append(period)
+                workday.append(period)
             
             if interval.get("weekend"):
-                schedule["weekend"].append(period)
+                weekend.append(period)
         
-        return schedule
+        return Schedule(workday, weekend)
     
-    def _calculate_current_tariff(self, schedule: Dict[str, List[Dict]]) -> str:
+    def _entry_schedule(self, entry: Dict[str, Any]) -> Dict[str, Any]:
         """
-        Vypočíta aktuálnu tarifu (low/high) na základe rozvrhu.
+        Doplní do položky indexu normalizovaný a skompilovaný rozvrh.
+        
+        Počíta sa len raz pre každý stiahnutý page, ďalšie volania
+        použijú uložený výsledok. Raw rate sa potom z položky odstráni.
         
         Args:
-            schedule: Normalizovaný rozvrh s workday/weekend
+            entry: Položka indexu z _build_index
             
         Returns:
-            "low" alebo "high"
+            Tá istá položka s kľúčmi 'raw_schedule' (periódy ako na webe),
+            'schedule' (zlúčené periódy) a 'compiled'
         """
-        from datetime import datetime
-        
-        now = datetime.now()
-        current_time = now.time()
-        is_weekend = now.weekday() >= 5  # 5=Saturday, 6=Sunday
-        
-        # Vyber správny rozvrh (pracovný deň / víkend)
-        periods = schedule["weekend"] if is_weekend else schedule["workday"]
+        if "compiled" not in entry:
+            entry["raw_schedule"] = self._normalize_schedule(entry.pop("rate").get("intervals") or [])
+            entry["schedule"] = entry["raw_schedule"].canonical()
+            entry["compiled"] = CompiledSchedule(entry["schedule"])
+        return entry
+    
+    def _calculate_current_tariff(self, compiled: CompiledSchedule) -> str:
+        """
+        Vypočíta aktuálnu tarifu (low/high) na základe rozvrhu.
         
-        # Kontrola či som v niektorom období nízkej tarify
-        for period in periods:
-            start = self._parse_time(period["start"])
-            end = self._parse_time(period["end"])
+        Args:
+            compiled: Skompilovaný rozvrh
             
-            # Riešenie prelomu polnoci (napr. 23:45 - 05:45)
-            if end < start:
-                # Rozdelené cez polnoc
-                if current_time >= start or current_time < end:
-                    return "low"
-            else:
-                # Normálne obdobie v rámci dňa
-                if start <= current_time < end:
-                    return "low"
-        
-        # Ak nie som v žiadnom období nízkej tarify → vysoká tarifa
-        return "high"
+        Returns:
+            "low" alebo "high"
+        """
+        return "low" if compiled.is_low_at(datetime.now()) else "high"
     
     async def get_all_hdo_numbers(self) -> List[int]:
         """
@@ -274,16 +646,9 @@ class ZSEHDOLiveParser:
         Returns:
             List of HDO codes (integers)
         """
-        html = await self.fetch_page()
-        
-        household = self._extract_javascript_array(html, "household_rates")
-        business = self._extract_javascript_array(html, "business_rates")
-        
-        all_codes = []
-        all_codes.extend([item["code"] for item in household])
-        all_codes.extend([item["code"] for item in business])
+        page = await self._get_page()
         
-        return sorted(list(set(all_codes)))
+        return list(page["codes"])
     
     async def get_schedule(self, hdo_number: int) -> Optional[Dict]:
         """
@@ -295,109 +660,404 @@ class ZSEHDOLiveParser:
         Returns:
             Dict s rozvrhom alebo None ak HDO neexistuje
         """
-        html = await self.fetch_page()
+        page = await self._get_page()
         
-        household = self._extract_javascript_array(html, "household_rates")
-        business = self._extract_javascript_array(html, "business_rates")
+        schedule = self._schedule_from_page(page, hdo_number)
+        if schedule is None:
+            _LOGGER.warning(f"HDO {hdo_number} not found")
+        return schedule
+    
+    def get_cached_schedule(self, hdo_number: int) -> Optional[Dict]:
+        """
+        Vráti rozvrh z poslednej známej stránky v cache bez sťahovania.
         
-        all_rates = household + business
+        Použije aj expirovanú stránku (napr. obnovenú z disku po reštarte).
         
-        # Debug logging
-        _LOGGER.debug(f"Searching for HDO {hdo_number} (type: {type(hdo_number).__name__})")
-        _LOGGER.debug(f"Available codes: {[rate['code'] for rate in all_rates[:3]]}")
+        Args:
+            hdo_number: HDO kód (napr. 145)
+            
+        Returns:
+            Dict s rozvrhom alebo None ak stránka/HDO nie je k dispozícii
+        """
+        page = self._cache.peek(self._url)
+        if page is None:
+            return None
+        return self._schedule_from_page(page, hdo_number)
+    
+    def _schedule_from_page(self, page: Dict[str, Any], hdo_number: int) -> Optional[Dict]:
+        """
+        Zostaví rozvrh HDO čísla zo sparsovanej stránky.
         
-        for rate in all_rates:
-            # Convert both to int for comparison (JSON might have strings)
-            rate_code = int(rate["code"]) if isinstance(rate["code"], str) else rate["code"]
-            hdo_num = int(hdo_number)
+        Args:
+            page: Sparsovaná stránka z _get_page
+            hdo_number: HDO kód
             
-            if rate_code == hdo_num:
-                schedule = self._normalize_schedule(rate["intervals"])
-                
-                # Získaj rate_type z prvého intervalu (všetky majú rovnaký)
-                rate_type = "Unknown"
-                if rate.get("intervals") and len(rate["intervals"]) > 0:
-                    rate_type = rate["intervals"][0].get("for_rate", "Unknown")
-                
-                # Vypočítaj aktuálnu tarifu
-                current_tariff = self._calculate_current_tariff(schedule)
-                
-                return {
-                    "hdo_number": hdo_number,
-                    "name": f"HDO {hdo_number}",
-                    "category": "household" if rate in household else "business",
-                    "rate_type": rate_type,
-                    "current_tariff": current_tariff,  # "low" alebo "high"
-                    "workday": schedule["workday"],
-                    "weekend": schedule["weekend"],
-                    "last_updated": datetime.now().isoformat(),
-                    "source": ZSE_HDO_URL
-                }
+        Returns:
+            Dict s rozvrhom (vrátane aktuálnej tarify) alebo None ak HDO neexistuje
+        """
+        entry = page["index"].get(int(hdo_number))
+        if entry is None:
+            return None
+        
+        view = self._schedule_view(page, entry, int(hdo_number))
+        
+        return {
+            **view,
+            **view["schedule"].as_dict(),  # 'workday'/'weekend' ako zoznamy dictov
+            "hdo_number": hdo_number,
+            "current_tariff": self._calculate_current_tariff(view["compiled"]),  # "low" alebo "high"
+        }
+    
+    def _schedule_view(
+        self, page: Dict[str, Any], entry: Dict[str, Any], hdo_number: int
+    ) -> Dict[str, Any]:
+        """
+        Vráti (zapamätaný) rozvrh HDO čísla pre daný page.
+        
+        Rovnaký page vracia vždy ten istý objekt - volajúci ho nesmú meniť.
+        
+        Args:
+            page: Sparsovaná stránka
+            entry: Položka indexu pre hdo_number
+            hdo_number: HDO kód
+            
+        Returns:
+            Dict s rozvrhom (zlúčený Schedule v 'schedule', pôvodný v
+            'raw_schedule') bez aktuálnej tarify
+        """
+        if "view" not in entry:
+            entry = self._entry_schedule(entry)
+            
+            entry["view"] = {
+                "hdo_number": hdo_number,
+                "name": f"HDO {hdo_number}",
+                "category": entry["category"],
+                "rate_type": entry["rate_type"],
+                "schedule": entry["schedule"],
+                "raw_schedule": entry["raw_schedule"],
+                "compiled": entry["compiled"],
+                "version": page["content_hash"],
+                "last_updated": page["updated_at"],
+                "source": self._url
+            }
+        return entry["view"]
+    
+    def _all_schedules_from_page(self, page: Dict[str, Any]) -> Dict[int, Dict]:
+        """
+        Vráti (zapamätané) rozvrhy všetkých HDO čísel pre daný page.
+        
+        Args:
+            page: Sparsovaná stránka
+            
+        Returns:
+            Dict s HDO číslom ako kľúčom a rozvrhom ako hodnotou
+        """
+        if "schedules" not in page:
+            page["schedules"] = {
+                hdo_number: self._schedule_view(page, entry, hdo_number)
+                for hdo_number, entry in page["index"].items()
+            }
+        return page["schedules"]
+    
+    def _page_index(self, page: Dict[str, Any]) -> ScheduleIndex:
+        """
+        Vráti (zapamätaný) index nízkej tarify naprieč kódmi pre daný page.
+        
+        Args:
+            page: Sparsovaná stránka
+            
+        Returns:
+            ScheduleIndex všetkých HDO kódov stránky
+        """
+        if "low_index" not in page:
+            page["low_index"] = ScheduleIndex({
+                hdo_number: view["compiled"]
+                for hdo_number, view in self._all_schedules_from_page(page).items()
+            })
+        return page["low_index"]
+    
+    def _page_catalog(self, page: Dict[str, Any]) -> HDOCatalog:
+        """
+        Vráti (zapamätaný) katalóg HDO kódov pre daný page.
+        
+        Args:
+            page: Sparsovaná stránka
+            
+        Returns:
+            HDOCatalog všetkých HDO kódov stránky
+        """
+        if "catalog" not in page:
+            page["catalog"] = HDOCatalog(self._all_schedules_from_page(page))
+        return page["catalog"]
+    
+    def dump_page(self) -> Optional[Dict[str, Any]]:
+        """
+        Serializuje poslednú známu stránku do kompaktného JSON-friendly tvaru.
+        
+        Ukladajú sa len intervaly nízkej tarify, ktoré integrácia používa.
+        
+        Returns:
+            Snapshot pre restore_page alebo None ak nie je čo uložiť
+        """
+        page = self._cache.peek(self._url)
+        if page is None:
+            return None
+        
+        rates = []
+        for code, entry in page["index"].items():
+            # Ukladajú sa pôvodné periódy - zlúčené sa z nich znovu vypočítajú
+            schedule = self._entry_schedule(entry)["raw_schedule"]
+            rates.append([
+                code,
+                entry["category"],
+                entry["rate_type"],
+                [
+                    [
+                        format_minutes(period.start),
+                        format_minutes(period.end),
+                        period in schedule.workday,
+                        period in schedule.weekend,
+                        period.meaning,
+                        period.for_rate,
+                    ]
+                    # Perióda platná v oba typy dňa sa uloží raz
+                    for period in dict.fromkeys(schedule.workday + schedule.weekend)
+                ],
+            ])
+        
+        return {
+            "content_hash": page["content_hash"],
+            "updated_at": page["updated_at"],
+            "etag": page["etag"],
+            "last_modified": page["last_modified"],
+            "checked_at": page.get("checked_at"),
+            "rates": rates,
+        }
+    
+    def restore_page(self, snapshot: Dict[str, Any]) -> bool:
+        """
+        Obnoví stránku zo snapshotu (dump_page) do cache ako expirovanú.
+        
+        Ďalší _get_page ju teda revaliduje (podmienený GET), ale
+        get_cached_schedule ju môže použiť hneď.
+        
+        Args:
+            snapshot: Výsledok dump_page
+            
+        Returns:
+            True ak bol snapshot použitý
+        """
+        if self._cache.peek(self._url) is not None:
+            return False  # Už máme novšie dáta
         
-        _LOGGER.warning(f"HDO {hdo_number} not found")
-        return None
+        try:
+            rates = {"household": [], "business": []}
+            rate_types = {}
+            
+            for code, category, rate_type, intervals in snapshot["rates"]:
+                rates[category].append({
+                    "code": code,
+                    "intervals": [
+                        {
+                            "t_type": "nt",
+                            "t_from": t_from,
+                            "t_to": t_to,
+                            "weekday": weekday,
+                            "weekend": weekend,
+                            "meaning": meaning,
+                            "for_rate": for_rate,
+                        }
+                        for t_from, t_to, weekday, weekend, meaning, for_rate in intervals
+                    ],
+                })
+                rate_types[code] = rate_type
+            
+            page = {
+                "index": self._build_index(rates["household"], rates["business"]),
+                "content_hash": snapshot["content_hash"],
+                "updated_at": snapshot["updated_at"],
+                "etag": snapshot.get("etag"),
+                "last_modified": snapshot.get("last_modified"),
+                "checked_at": snapshot.get("checked_at"),
+            }
+            
+            for code, entry in page["index"].items():
+                entry["rate_type"] = rate_types.get(code, entry["rate_type"])
+            page["codes"] = sorted(page["index"])
+            
+            self._all_schedules_from_page(page)
+            self._page_index(page)
+        except (KeyError, TypeError, ValueError) as err:
+            _LOGGER.warning(f"Ignoring invalid stored HDO snapshot: {err}")
+            return False
+        
+        self._cache.set(self._url, page, stale=True)
+        _LOGGER.debug(f"Restored {len(page['codes'])} HDO codes from stored snapshot")
+        return True
     
     async def get_all_schedules(self) -> Dict[int, Dict]:
         """
         Získa všetky HDO rozvrhy.
         
+        Pre nezmenenú stránku vracia ten istý (zdieľaný) objekt.
+        
         Returns:
             Dict s HDO číslom ako kľúčom a rozvrhom ako hodnotou
         """
-        html = await self.fetch_page()
+        page = await self._get_page()
+        
+        return self._all_schedules_from_page(page)
+    
+    async def get_catalog(self, max_age: float = CATALOG_MAX_AGE) -> HDOCatalog:
+        """
+        Získa katalóg HDO kódov, bez sťahovania ak je stránka v cache čerstvá.
         
-        household = self._extract_javascript_array(html, "household_rates")
-        business = self._extract_javascript_array(html, "business_rates")
+        Args:
+            max_age: Najväčší vek obsahu (od posledného overenia na webe) v sekundách
+            
+        Returns:
+            HDOCatalog všetkých HDO kódov
+        """
+        page = self._cache.peek(self._url)
+        if page is None or time.time() - (page.get("checked_at") or 0) >= max_age:
+            page = await self._get_page()
+        
+        return self._page_catalog(page)
+    
+    def get_cached_catalog(self) -> Optional[HDOCatalog]:
+        """
+        Vráti katalóg HDO kódov z poslednej známej stránky v cache bez sťahovania.
+        
+        Returns:
+            HDOCatalog alebo None ak stránka nie je k dispozícii
+        """
+        page = self._cache.peek(self._url)
+        if page is None:
+            return None
+        return self._page_catalog(page)
+    
+    def get_cached_schedules(self) -> Optional[Dict[int, Dict]]:
+        """
+        Vráti všetky rozvrhy z poslednej známej stránky v cache bez sťahovania.
+        
+        Returns:
+            Dict s HDO číslom ako kľúčom alebo None ak stránka nie je k dispozícii
+        """
+        page = self._cache.peek(self._url)
+        if page is None:
+            return None
+        return self._all_schedules_from_page(page)
+    
+    async def get_transitions(
+        self,
+        hdo_number: int,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Postupne vracia prepnutia tarify pre HDO číslo.
         
-        all_schedules = {}
+        Týždenný vzor sa opakuje bez rozpisovania po dňoch, takže aj dlhý
+        horizont je lacný (napr. async for ... v rámci celého roka).
         
-        for rate in household + business:
-            hdo_number = rate["code"]
-            schedule = self._normalize_schedule(rate["intervals"])
+        Args:
+            hdo_number: HDO kód
+            start: Začiatok horizontu (None = teraz)
+            end: Koniec horizontu vrátane (None = bez konca)
             
-            all_schedules[hdo_number] = {
-                "hdo_number": hdo_number,
-                "name": f"HDO {hdo_number}",
-                "category": "household" if rate in household else "business",
-                "workday": schedule["workday"],
-                "weekend": schedule["weekend"]
-            }
+        Yields:
+            Dict s 'datetime' a 'to_tariff' ("low" alebo "high")
+        """
+        page = await self._get_page()
+        
+        entry = page["index"].get(int(hdo_number))
+        if entry is None:
+            _LOGGER.warning(f"HDO {hdo_number} not found")
+            return
         
-        return all_schedules
+        compiled = self._entry_schedule(entry)["compiled"]
+        for switch, to_low in compiled.transitions(start or datetime.now(), end):
+            yield {"datetime": switch, "to_tariff": "low" if to_low else "high"}
     
-    async def is_low_tariff_now(self, hdo_number: int) -> Optional[bool]:
+    async def is_low_tariff_many(self, hdo_number: int, timestamps: Any) -> Optional[Any]:
         """
-        Kontroluje či je práve teraz nízka tarifa.
+        Kontroluje nízku tarifu pre veľa časov naraz (stránka sa načíta raz).
         
         Args:
             hdo_number: HDO kód
+            timestamps: Pole numpy.datetime64 alebo iterable datetime
+                (viď CompiledSchedule.is_low_many)
             
         Returns:
-            True = nízka tarifa, False = vysoká tarifa, None = neznáme HDO
+            Bool pole (s NumPy) alebo zoznam bool, None = neznáme HDO
         """
-        schedule = await self.get_schedule(hdo_number)
-        if not schedule:
+        page = await self._get_page()
+        
+        entry = page["index"].get(int(hdo_number))
+        if entry is None:
             return None
         
-        now = datetime.now()
-        current_time = now.time()
-        is_weekend = now.weekday() >= 5  # 5=sobota, 6=nedeľa
+        return self._entry_schedule(entry)["compiled"].is_low_many(timestamps)
+    
+    async def get_low_codes(self, when: Optional[datetime] = None) -> List[int]:
+        """
+        Vráti HDO kódy, ktoré majú v danom čase nízku tarifu.
+        
+        Args:
+            when: Čas (None = teraz)
+            
+        Returns:
+            Zoradený zoznam HDO kódov
+        """
+        page = await self._get_page()
+        
+        return self._page_index(page).low_codes_at(when or datetime.now())
+    
+    async def get_common_low_periods(
+        self,
+        hdo_numbers: List[int],
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Postupne vracia obdobia, keď majú všetky HDO čísla naraz nízku tarifu.
+        
+        Args:
+            hdo_numbers: HDO kódy (napr. viacerých odberných miest)
+            start: Začiatok horizontu (None = teraz)
+            end: Koniec horizontu (None = bez konca)
+            
+        Yields:
+            Dict so 'start' a 'end'
+        """
+        page = await self._get_page()
         
-        periods = schedule["weekend"] if is_weekend else schedule["workday"]
+        index = self._page_index(page)
+        missing = [code for code in hdo_numbers if int(code) not in index]
+        if missing:
+            _LOGGER.warning(f"HDO {missing} not found")
+            return
         
-        for period in periods:
-            start = self._parse_time(period["start"])
-            end = self._parse_time(period["end"])
+        for period_start, period_end in index.common_low(hdo_numbers, start or datetime.now(), end):
+            yield {"start": period_start, "end": period_end}
+    
+    async def is_low_tariff_now(self, hdo_number: int) -> Optional[bool]:
+        """
+        Kontroluje či je práve teraz nízka tarifa.
+        
+        Args:
+            hdo_number: HDO kód
             
-            # Handle midnight crossover
-            if end < start:
-                if current_time >= start or current_time < end:
-                    return True
-            else:
-                if start <= current_time < end:
-                    return True
+        Returns:
+            True = nízka tarifa, False = vysoká tarifa, None = neznáme HDO
+        """
+        page = await self._get_page()
+        
+        entry = page["index"].get(int(hdo_number))
+        if entry is None:
+            return None
         
-        return False
+        return self._entry_schedule(entry)["compiled"].is_low_at(datetime.now())
 
 
 # ==============================================
@@ -406,8 +1066,6 @@ class ZSEHDOLiveParser:
 
 async def main():
     """Príklad použitia parsera."""
-    import asyncio
-    
     logging.basicConfig(level=logging.DEBUG)
     
     async with ZSEHDOLiveParser() as parser:
@@ -442,5 +1100,4 @@ async def main():
 
 
 if __name__ == "__main__":
-    import asyncio
     asyncio.run(main())
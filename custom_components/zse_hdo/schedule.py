@@ -0,0 +1,562 @@
+"""
+ZSE HDO Compiled Schedule
+=========================
+
+Kompaktný model rozvrhu (Period/Schedule s časmi v minútach dňa) a jeho
+kompilácia do týždennej bitmapy - 1 bit za každú minútu týždňa (10080
+bitov). Otázka "je v čase t nízka tarifa" je potom jedno indexovanie do
+bitmapy a najbližšia zmena tarify sa hľadá binárnym vyhľadávaním v
+hraniciach.
+
+Author: Miroslav Burdych (@mburdych)
+GitHub: https://github.com/mburdych/ZSED-tarify
+Support: https://buymeacoffee.com/mburdych
+
+License: MIT
+"""
+
+import sys
+from bisect import bisect_right
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from weakref import WeakValueDictionary
+
+try:
+    import numpy as np
+except ImportError:  # NumPy je voliteľný - dávková klasifikácia má aj čistý Python
+    np = None
+
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+
+# Bajtov na bitmapu (10080 bitov)
+_BITMAP_BYTES = MINUTES_PER_WEEK // 8
+_BITMAP_MASK = (1 << MINUTES_PER_WEEK) - 1
+
+
+def parse_minutes(time_str: str) -> int:
+    """
+    Konvertuje "HH:MM" (alebo "H:MM") na minútu dňa.
+
+    Args:
+        time_str: Čas vo formáte "HH:MM"; "24:00" je koniec dňa
+
+    Returns:
+        Minúta dňa 0-1440
+    """
+    hour, minute = time_str.split(":")
+    return int(hour) * 60 + int(minute)
+
+
+def format_minutes(minutes: int) -> str:
+    """Konvertuje minútu dňa späť na "HH:MM"."""
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def minute_of_week(when: datetime) -> int:
+    """Vráti minútu týždňa (pondelok 00:00 = 0)."""
+    return when.weekday() * MINUTES_PER_DAY + when.hour * 60 + when.minute
+
+
+def is_weekend_day(weekday: int) -> bool:
+    """Vráti True pre sobotu a nedeľu (5, 6)."""
+    return weekday >= 5
+
+
+def minutes_of_week(timestamps: Any) -> "np.ndarray":
+    """
+    Vektorová verzia minute_of_week (vyžaduje NumPy).
+
+    Args:
+        timestamps: Pole numpy.datetime64 / ISO stringov alebo iterable
+            datetime; rozhoduje lokálny čas, časová zóna sa ignoruje
+
+    Returns:
+        Pole int64 minút týždňa
+    """
+    values = np.asarray(timestamps)
+    if values.dtype == object:
+        # Python datetime - minúta týždňa priamo z polí (rýchlejšie ako konverzia)
+        return np.fromiter(
+            (minute_of_week(when) for when in values.ravel()), dtype=np.int64, count=values.size
+        ).reshape(values.shape)
+
+    minutes = values.astype("datetime64[m]").astype(np.int64)
+    # 1970-01-01 bol štvrtok - 3 dni po pondelku
+    return (minutes + 3 * MINUTES_PER_DAY) % MINUTES_PER_WEEK
+
+
+class Period:
+    """Jedna perióda nízkej tarify - začiatok a koniec v minútach dňa."""
+
+    __slots__ = ("start", "end", "meaning", "for_rate", "__weakref__")
+
+    # Rovnaké periódy (naprieč HDO kódmi aj typmi dňa) zdieľajú jeden objekt
+    _pool: "WeakValueDictionary[Tuple[int, int, str, str], Period]" = WeakValueDictionary()
+
+    def __init__(self, start: int, end: int, meaning: str = "", for_rate: str = ""):
+        """
+        Initialize period.
+
+        Args:
+            start: Začiatok v minútach dňa
+            end: Koniec v minútach dňa (1440 = "24:00", menší ako start = cez polnoc)
+            meaning: Popis periódy zo ZSE
+            for_rate: Sadzba, pre ktorú perióda platí
+        """
+        self.start = start
+        self.end = end
+        self.meaning = meaning
+        self.for_rate = for_rate
+
+    @classmethod
+    def create(cls, start: int, end: int, meaning: str = "", for_rate: str = "") -> "Period":
+        """
+        Vráti zdieľaný Period pre dané hodnoty (stringy sú internované).
+
+        Args:
+            start: Začiatok v minútach dňa
+            end: Koniec v minútach dňa
+            meaning: Popis periódy zo ZSE
+            for_rate: Sadzba, pre ktorú perióda platí
+
+        Returns:
+            Existujúci alebo nový Period
+        """
+        key = (start, end, sys.intern(meaning), sys.intern(for_rate))
+        period = cls._pool.get(key)
+        if period is None:
+            period = cls(*key)
+            cls._pool[key] = period
+        return period
+
+    def __eq__(self, other: object) -> bool:
+        """Two periods are equal if all their fields are equal."""
+        if not isinstance(other, Period):
+            return NotImplemented
+        return (self.start, self.end, self.meaning, self.for_rate) == (
+            other.start, other.end, other.meaning, other.for_rate
+        )
+
+    def __hash__(self) -> int:
+        """Hash of all fields."""
+        return hash((self.start, self.end, self.meaning, self.for_rate))
+
+    def __repr__(self) -> str:
+        """Return readable representation."""
+        return f"Period({format_minutes(self.start)}-{format_minutes(self.end)})"
+
+    def as_dict(self) -> Dict[str, str]:
+        """Vráti periódu v pôvodnom tvare (start/end ako "HH:MM")."""
+        return {
+            "start": format_minutes(self.start),
+            "end": format_minutes(self.end),
+            "tariff": "low",
+            "meaning": self.meaning,
+            "for_rate": self.for_rate,
+        }
+
+
+class Schedule:
+    """Rozvrh nízkej tarify - periódy pre pracovné dni a víkend."""
+
+    __slots__ = ("workday", "weekend")
+
+    def __init__(self, workday: Iterable[Period] = (), weekend: Iterable[Period] = ()):
+        """
+        Initialize schedule.
+
+        Args:
+            workday: Periódy pracovného dňa
+            weekend: Periódy víkendu
+        """
+        # Zoradené podľa začiatku; perióda platná v oba typy dňa je jeden objekt
+        self.workday: Tuple[Period, ...] = tuple(sorted(workday, key=_period_key))
+        self.weekend: Tuple[Period, ...] = tuple(sorted(weekend, key=_period_key))
+
+    def __eq__(self, other: object) -> bool:
+        """Two schedules are equal if their periods are equal."""
+        if not isinstance(other, Schedule):
+            return NotImplemented
+        return self.workday == other.workday and self.weekend == other.weekend
+
+    def __hash__(self) -> int:
+        """Hash of the periods."""
+        return hash((self.workday, self.weekend))
+
+    def periods(self, weekend: bool) -> Tuple[Period, ...]:
+        """
+        Vráti periódy pre typ dňa.
+
+        Args:
+            weekend: True pre víkendový rozvrh
+        """
+        return self.weekend if weekend else self.workday
+
+    def as_dict(self) -> Dict[str, List[Dict[str, str]]]:
+        """Vráti rozvrh v pôvodnom tvare {'workday': [...], 'weekend': [...]}."""
+        return {
+            "workday": [period.as_dict() for period in self.workday],
+            "weekend": [period.as_dict() for period in self.weekend],
+        }
+
+    def canonical(self) -> "Schedule":
+        """
+        Vráti minimálny ekvivalentný rozvrh.
+
+        Prekrývajúce sa a nadväzujúce periódy sa zlúčia a prázdne sa
+        vynechajú. Perióda cez polnoc zostáva jedna - jej časť po polnoci
+        patrí nasledujúcemu dňu, ktorý môže byť iného typu (piatok →
+        sobota), takže ju nemožno presunúť do rozvrhu toho istého typu dňa.
+
+        Returns:
+            Nový Schedule alebo self, ak už je minimálny
+        """
+        workday = _merge_periods(self.workday)
+        weekend = _merge_periods(self.weekend)
+        if workday == self.workday and weekend == self.weekend:
+            return self
+        return Schedule(workday, weekend)
+
+
+def _period_key(period: Period) -> Tuple[int, int]:
+    """Kľúč zoradenia periód."""
+    return (period.start, period.end)
+
+
+def _join_unique(values: Iterable[str]) -> str:
+    """Spojí neprázdne hodnoty bez opakovania."""
+    return ", ".join(dict.fromkeys(value for value in values if value))
+
+
+def _merge_periods(periods: Tuple[Period, ...]) -> Tuple[Period, ...]:
+    """
+    Zlúči prekrývajúce sa a nadväzujúce periódy jedného typu dňa.
+
+    Args:
+        periods: Periódy zoradené podľa začiatku
+
+    Returns:
+        Minimálne periódy (nezlúčené periódy sú pôvodné objekty)
+    """
+    # [začiatok, koniec, zlúčené periódy]; koniec po polnoci je za MINUTES_PER_DAY
+    groups: List[List[Any]] = []
+    for period in periods:
+        if period.start == period.end:
+            continue  # Prázdna perióda
+
+        end = period.end + (MINUTES_PER_DAY if period.end < period.start else 0)
+        if groups and period.start <= groups[-1][1]:
+            groups[-1][1] = max(groups[-1][1], end)
+            groups[-1][2].append(period)
+        else:
+            groups.append([period.start, end, [period]])
+
+    merged: List[Period] = []
+    for start, end, members in groups:
+        if len(members) == 1:
+            merged.append(members[0])
+        elif end - start >= MINUTES_PER_DAY:
+            # Celý deň a ešte časť ďalšieho - jednou periódou sa nedá zapísať
+            merged.extend(members)
+        else:
+            merged.append(Period.create(
+                start,
+                end if end <= MINUTES_PER_DAY else end - MINUTES_PER_DAY,
+                _join_unique(member.meaning for member in members),
+                _join_unique(member.for_rate for member in members),
+            ))
+    return tuple(merged)
+
+
+class CompiledSchedule:
+    """Týždenná bitmapa nízkej tarify skompilovaná z rozvrhu."""
+
+    __slots__ = ("schedule", "_bitmap", "_boundaries", "_table", "_prefix")
+
+    def __init__(self, schedule: Schedule):
+        """
+        Skompiluje rozvrh.
+
+        Args:
+            schedule: Rozvrh s periódami pre pracovné dni a víkend
+        """
+        self.schedule = schedule
+
+        bits = 0
+        for day in range(7):
+            day_start = day * MINUTES_PER_DAY
+
+            for period in schedule.periods(is_weekend_day(day)):
+                start = day_start + period.start
+                end = day_start + period.end
+                if period.end < period.start:
+                    # Prelom polnoci (napr. 23:45 - 05:45) pokračuje do ďalšieho
+                    # dňa - aj z piatku do soboty a z nedele do pondelka
+                    end += MINUTES_PER_DAY
+
+                if end > MINUTES_PER_WEEK:
+                    ranges = ((start, MINUTES_PER_WEEK), (0, end - MINUTES_PER_WEEK))
+                else:
+                    ranges = ((start, end),)
+
+                for range_start, range_end in ranges:
+                    if range_end > range_start:
+                        bits |= ((1 << (range_end - range_start)) - 1) << range_start
+
+        self._bitmap = bits.to_bytes(_BITMAP_BYTES, "little")
+
+        # Minúty týždňa, v ktorých sa tarifa mení (bit m != bit m-1, cyklicky)
+        previous = ((bits << 1) | (bits >> (MINUTES_PER_WEEK - 1))) & _BITMAP_MASK
+        changes = bits ^ previous
+        boundaries = []
+        while changes:
+            lowest = changes & -changes
+            boundaries.append(lowest.bit_length() - 1)
+            changes ^= lowest
+        self._boundaries: Tuple[int, ...] = tuple(boundaries)
+
+        # Tabuľka bajt/bool za minútu pre dávkovú klasifikáciu (vytvorí sa pri prvom použití)
+        self._table = None
+        self._prefix = None
+
+    def __eq__(self, other: object) -> bool:
+        """Two schedules are equal if their bitmaps are equal."""
+        if not isinstance(other, CompiledSchedule):
+            return NotImplemented
+        return self._bitmap == other._bitmap
+
+    def __hash__(self) -> int:
+        """Hash of the bitmap."""
+        return hash(self._bitmap)
+
+    @property
+    def boundaries(self) -> Tuple[int, ...]:
+        """Zoradené minúty týždňa, v ktorých sa tarifa mení."""
+        return self._boundaries
+
+    def is_low(self, minute: int) -> bool:
+        """
+        Je v danej minúte týždňa nízka tarifa?
+
+        Args:
+            minute: Minúta týždňa (pondelok 00:00 = 0)
+        """
+        minute %= MINUTES_PER_WEEK
+        return bool(self._bitmap[minute >> 3] >> (minute & 7) & 1)
+
+    def is_low_at(self, when: datetime) -> bool:
+        """Je v čase when nízka tarifa?"""
+        return self.is_low(minute_of_week(when))
+
+    def is_low_many(self, timestamps: Any) -> Union["np.ndarray", List[bool]]:
+        """
+        Klasifikuje veľa časov naraz (napr. 15-minútové odpočty elektromera).
+
+        S NumPy je vyhľadanie v tabuľke minút týždňa vektorové a výsledok
+        je bool pole, bez NumPy zoznam bool.
+
+        Args:
+            timestamps: Pole numpy.datetime64 / ISO stringov alebo iterable
+                datetime / ISO stringov (bez NumPy); rozhoduje lokálny čas,
+                časová zóna sa ignoruje
+
+        Returns:
+            True pre časy v nízkej tarife
+        """
+        table = self._minute_table()
+        if np is not None:
+            return table[minutes_of_week(timestamps)]
+        # Bez NumPy ISO stringy konvertuje datetime.fromisoformat
+        return [
+            table[minute_of_week(
+                datetime.fromisoformat(when) if isinstance(when, str) else when
+            )] == 1
+            for when in timestamps
+        ]
+
+    def low_minutes(self, minute: int, length: int) -> int:
+        """
+        Počet minút nízkej tarify v okne [minute, minute + length).
+
+        Konštantný čas vďaka prefixovým súčtom cez týždeň.
+
+        Args:
+            minute: Začiatok okna ako minúta týždňa
+            length: Dĺžka okna v minútach (aj viac ako týždeň)
+
+        Returns:
+            Počet minút nízkej tarify v okne
+        """
+        prefix = self._prefix_sums()
+        weeks, length = divmod(length, MINUTES_PER_WEEK)
+        minute %= MINUTES_PER_WEEK
+        return int(weeks * prefix[MINUTES_PER_WEEK] + prefix[minute + length] - prefix[minute])
+
+    def low_minutes_many(self, minutes: Any, length: int) -> Union["np.ndarray", List[int]]:
+        """
+        Vektorová verzia low_minutes pre veľa začiatkov s rovnakou dĺžkou okna.
+
+        Args:
+            minutes: Začiatky okien ako minúty týždňa (pole alebo iterable)
+            length: Dĺžka okna v minútach
+
+        Returns:
+            Počty minút nízkej tarify (int pole s NumPy, inak zoznam)
+        """
+        if np is None:
+            return [self.low_minutes(minute, length) for minute in minutes]
+
+        prefix = self._prefix_sums()
+        weeks, length = divmod(length, MINUTES_PER_WEEK)
+        minutes = np.asarray(minutes, dtype=np.int64) % MINUTES_PER_WEEK
+        return weeks * int(prefix[MINUTES_PER_WEEK]) + prefix[minutes + length] - prefix[minutes]
+
+    def _prefix_sums(self) -> Union["np.ndarray", List[int]]:
+        """Vráti (zapamätané) prefixové súčty tabuľky minút cez dva týždne (cyklické okná)."""
+        if self._prefix is None:
+            table = self._minute_table()
+            if np is not None:
+                self._prefix = np.concatenate(
+                    ([0], np.cumsum(np.tile(table, 2), dtype=np.int64))
+                )
+            else:
+                prefix = [0]
+                for minute in range(2 * MINUTES_PER_WEEK):
+                    prefix.append(prefix[-1] + table[minute % MINUTES_PER_WEEK])
+                self._prefix = prefix
+        return self._prefix
+
+    def _minute_table(self) -> Union["np.ndarray", bytes]:
+        """Vráti (zapamätanú) tabuľku nízkej tarify po minútach týždňa."""
+        if self._table is None:
+            if np is not None:
+                bits = np.unpackbits(np.frombuffer(self._bitmap, dtype=np.uint8), bitorder="little")
+                self._table = bits.astype(bool)
+            else:
+                bits = int.from_bytes(self._bitmap, "little")
+                self._table = bytes((bits >> minute) & 1 for minute in range(MINUTES_PER_WEEK))
+        return self._table
+
+    def next_change(self, when: datetime) -> Optional[datetime]:
+        """
+        Vráti najbližší okamih po when, kedy sa tarifa zmení.
+
+        Args:
+            when: Východiskový čas (naive alebo s časovou zónou)
+
+        Returns:
+            Začiatok minúty so zmenou tarify alebo None ak sa tarifa nemení
+        """
+        if not self._boundaries:
+            return None
+
+        minute = minute_of_week(when)
+        index = bisect_right(self._boundaries, minute)
+        if index < len(self._boundaries):
+            delta = self._boundaries[index] - minute
+        else:
+            delta = self._boundaries[0] + MINUTES_PER_WEEK - minute
+
+        return when.replace(second=0, microsecond=0) + timedelta(minutes=delta)
+
+    def next_switch(self, when: datetime) -> Optional[Tuple[datetime, bool]]:
+        """
+        Vráti najbližšie prepnutie tarify po when a tarifu po prepnutí.
+
+        Hranice sú predpočítané pre celý týždeň, takže výsledok je správny
+        aj cez polnoc a pri zmene typu dňa (piatok → sobota).
+
+        Args:
+            when: Východiskový čas (naive alebo s časovou zónou)
+
+        Returns:
+            Tuple (čas prepnutia, True ak sa prepína na nízku tarifu)
+            alebo None ak sa tarifa nemení
+        """
+        switch = self.next_change(when)
+        if switch is None:
+            return None
+        return switch, not self.is_low_at(when)
+
+    def transitions(
+        self, start: datetime, end: Optional[datetime] = None
+    ) -> Iterator[Tuple[datetime, bool]]:
+        """
+        Postupne vracia prepnutia tarify v intervale (start, end].
+
+        Týždenný vzor sa len opakuje - nič sa nepočíta po dňoch, takže aj
+        ročný horizont je lacný a volajúci môže kedykoľvek prestať čítať.
+
+        Args:
+            start: Začiatok (naive alebo s časovou zónou)
+            end: Koniec vrátane; None = bez konca
+
+        Yields:
+            Tuple (čas prepnutia, True ak sa prepína na nízku tarifu)
+        """
+        boundaries = self._boundaries
+        if not boundaries:
+            return
+
+        minute = minute_of_week(start)
+        week_start = start.replace(second=0, microsecond=0) - timedelta(minutes=minute)
+        index = bisect_right(boundaries, minute)
+
+        while True:
+            if index == len(boundaries):
+                index = 0
+                week_start += timedelta(weeks=1)
+
+            boundary = boundaries[index]
+            switch = week_start + timedelta(minutes=boundary)
+            if end is not None and switch > end:
+                return
+
+            yield switch, self.is_low(boundary)
+            index += 1
+
+    def best_window(
+        self, earliest: datetime, deadline: datetime, duration: int
+    ) -> Optional[Tuple[datetime, int]]:
+        """
+        Nájde začiatok okna danej dĺžky s najviac minútami nízkej tarify.
+
+        Počet minút nízkej tarify v okne je po častiach lineárny, maximum
+        preto leží na okraji rozsahu alebo tam, kde začiatok či koniec okna
+        padne na hranicu tarify - stačí vyskúšať tieto kandidáty (prefixové
+        súčty, žiadne prechádzanie po minútach). Pri zhode vyhráva skorší.
+
+        Args:
+            earliest: Najskorší možný začiatok
+            deadline: Čas, do ktorého musí okno skončiť
+            duration: Dĺžka okna v minútach
+
+        Returns:
+            Tuple (začiatok okna, minúty nízkej tarify) alebo None ak sa
+            okno do deadline nezmestí
+        """
+        earliest = earliest.replace(second=0, microsecond=0) + (
+            timedelta(minutes=1) if earliest.second or earliest.microsecond else timedelta()
+        )
+        latest = deadline.replace(second=0, microsecond=0) - timedelta(minutes=duration)
+        if latest < earliest:
+            return None
+
+        # Tarifa sa opakuje po týždňoch - ďalej ako týždeň netreba hľadať
+        latest = min(latest, earliest + timedelta(weeks=1))
+
+        candidates = {earliest, latest}
+        window = timedelta(minutes=duration)
+        for switch, _ in self.transitions(earliest, latest + window):
+            for start in (switch, switch - window):
+                if earliest <= start <= latest:
+                    candidates.add(start)
+
+        best = None
+        for start in sorted(candidates):
+            low = self.low_minutes(minute_of_week(start), duration)
+            if best is None or low > best[1]:
+                best = (start, low)
+
+        return best
@@ -0,0 +1,123 @@
+"""
+ZSE HDO Update Scheduler
+========================
+
+Plánovanie naplánovaných aktualizácií (1day/1week/1month):
+
+- každá inštalácia má stály posun v okne od SCHEDULED_UPDATE_HOUR
+  odvodený z jej ID, takže web ZSE nedostane všetky požiadavky v tú istú
+  sekundu, no jedna inštalácia sťahuje vždy v rovnakom čase
+- interval sa prispôsobuje tomu, ako často sa rozvrh na webe skutočne
+  mení - pri stabilnom rozvrhu sa aktualizácie rozostúpia
+
+Author: Miroslav Burdych (@mburdych)
+GitHub: https://github.com/mburdych/ZSED-tarify
+Support: https://buymeacoffee.com/mburdych
+
+License: MIT
+"""
+
+import hashlib
+from datetime import datetime, timedelta
+from typing import Optional, Sequence
+
+from .const import (
+    SCHEDULED_UPDATE_HOUR,
+    ADAPTIVE_CHECKS_PER_CHANGE,
+    ADAPTIVE_MAX_STRETCH,
+    ADAPTIVE_MAX_INTERVAL,
+)
+
+
+def instance_offset(seed: str, window: int) -> int:
+    """
+    Stály posun aktualizácie pre inštaláciu.
+
+    Args:
+        seed: Identifikátor inštalácie (napr. instance ID Home Assistanta)
+        window: Šírka okna v sekundách
+
+    Returns:
+        Posun v sekundách v rozsahu 0 až window - 1
+    """
+    if window <= 0:
+        return 0
+    digest = hashlib.sha256(seed.encode()).digest()
+    return int.from_bytes(digest[:8], "big") % window
+
+
+def adaptive_interval(
+    base: float,
+    changes: Sequence[datetime],
+    observed_since: Optional[datetime],
+    now: datetime,
+) -> float:
+    """
+    Interval aktualizácií podľa pozorovaných zmien rozvrhu na webe.
+
+    Odhad času medzi zmenami je priemerný rozostup zaznamenaných zmien,
+    alebo (ak ich je menej ako dve) čas, odkedy sa rozvrh nezmenil. Web
+    sa za ten čas skontroluje ADAPTIVE_CHECKS_PER_CHANGE-krát, nikdy nie
+    zriedkavejšie ako ADAPTIVE_MAX_STRETCH-násobok zvolenej frekvencie.
+
+    Args:
+        base: Zvolená frekvencia v sekundách
+        changes: Časy pozorovaných zmien obsahu (vzostupne)
+        observed_since: Čas prvého stiahnutia rozvrhu (None = neznámy)
+        now: Aktuálny čas
+
+    Returns:
+        Interval v sekundách, najmenej base
+    """
+    last_seen = changes[-1] if changes else observed_since
+    if last_seen is None:
+        return base
+
+    # Čas bez zmeny je dolný odhad rozostupu zmien
+    expected = (now - last_seen).total_seconds()
+    if len(changes) >= 2:
+        mean_gap = (changes[-1] - changes[0]).total_seconds() / (len(changes) - 1)
+        expected = max(expected, mean_gap)
+
+    limit = max(base, min(base * ADAPTIVE_MAX_STRETCH, ADAPTIVE_MAX_INTERVAL))
+    return min(max(base, expected / ADAPTIVE_CHECKS_PER_CHANGE), limit)
+
+
+def _next_anchor(frequency: str, anchor: datetime) -> datetime:
+    """Ďalší deň/pondelok/1. deň mesiaca o SCHEDULED_UPDATE_HOUR."""
+    if frequency == "1week":
+        return anchor + timedelta(weeks=1)
+    if frequency == "1month":
+        if anchor.month == 12:
+            return anchor.replace(year=anchor.year + 1, month=1)
+        return anchor.replace(month=anchor.month + 1)
+    return anchor + timedelta(days=1)
+
+
+def next_scheduled_update(frequency: str, after: datetime, offset: int) -> datetime:
+    """
+    Najbližší termín naplánovanej aktualizácie po danom čase.
+
+    Termíny sú každý deň (1day), každý pondelok (1week) alebo 1. deň
+    mesiaca (1month) o SCHEDULED_UPDATE_HOUR plus posun inštalácie.
+    Neznáma frekvencia sa plánuje denne.
+
+    Args:
+        frequency: Kľúč z UPDATE_FREQUENCIES
+        after: Termín musí byť neskôr (lokálny čas s časovou zónou)
+        offset: Posun od SCHEDULED_UPDATE_HOUR v sekundách
+
+    Returns:
+        Čas aktualizácie v časovej zóne after
+    """
+    anchor = after.replace(hour=SCHEDULED_UPDATE_HOUR, minute=0, second=0, microsecond=0)
+    if frequency == "1week":
+        anchor -= timedelta(days=anchor.weekday())  # 0 = pondelok
+    elif frequency == "1month":
+        anchor = anchor.replace(day=1)
+
+    # Posun môže termín z predchádzajúceho obdobia presunúť až za after
+    while anchor + timedelta(seconds=offset) <= after:
+        anchor = _next_anchor(frequency, anchor)
+
+    return anchor + timedelta(seconds=offset)
@@ -1,7 +1,7 @@
 """Sensor platform for ZSE HDO Live integration.
 
-Provides binary sensor for tariff status and sensors for next switch time
-and today's schedule.
+Provides binary sensor for tariff status, sensors for next switch time
+and today's schedule and an optional diagnostic metrics sensor.
 
 Author: Miroslav Burdych (@mburdych)
 GitHub: https://github.com/mburdych/ZSED-tarify
@@ -11,20 +11,29 @@ License: MIT
 """
 
 import logging
-from datetime import datetime, time, timedelta
-from typing import Any, Dict, Optional
+from abc import abstractmethod
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional, Tuple
 
 from homeassistant.components.binary_sensor import (
     BinarySensorEntity,
     BinarySensorDeviceClass,
 )
-from homeassistant.components.sensor import SensorEntity
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorStateClass,
+)
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import MATCH_ALL, EntityCategory, UnitOfTime
 from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.util import dt as dt_util
 
-from .const import DOMAIN
+from .const import DOMAIN, DATA_METRICS_ENTRY, METRICS_UNIQUE_ID
+from .metrics import ZSEHDOMetrics
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -44,10 +53,131 @@ async def async_setup_entry(
         ZSEHDOTodayScheduleSensor(coordinator, entry, hdo_number),
     ]
     
+    # Metriky sú spoločné pre celú doménu - sensor má len jedna entry
+    if _async_claim_metrics_entity(hass, entry):
+        entities.append(ZSEHDOMetricsSensor(coordinator, entry))
+    
     async_add_entities(entities)
 
 
-class ZSEHDOTariffSensor(CoordinatorEntity, BinarySensorEntity):
+@callback
+def _async_claim_metrics_entity(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+    """Return True if this entry provides the domain-wide metrics sensor."""
+    domain_data = hass.data[DOMAIN]
+    owner = domain_data.get(DATA_METRICS_ENTRY)
+    
+    if owner is None or hass.config_entries.async_get_entry(owner) is None:
+        # Prednosť má entry, ku ktorej je sensor už zaregistrovaný
+        registry = er.async_get(hass)
+        entity_id = registry.async_get_entity_id("sensor", DOMAIN, METRICS_UNIQUE_ID)
+        registered = registry.async_get(entity_id) if entity_id else None
+        owner = registered.config_entry_id if registered is not None else None
+        if owner is None or hass.config_entries.async_get_entry(owner) is None:
+            owner = entry.entry_id
+        domain_data[DATA_METRICS_ENTRY] = owner
+    
+    return owner == entry.entry_id
+
+
+class ZSEHDOEntity(CoordinatorEntity):
+    """Základ entít - číta rozvrh svojho HDO čísla zo spoločného coordinatora.
+
+    Stav a atribúty sa počítajú raz do "pohľadu", ktorý platí pre ten istý
+    rozvrh až do času z _build_view (napr. najbližšie prepnutie tarify).
+    Nezmenený pohľad sa do state machine znovu nezapisuje.
+    """
+
+    _hdo_number: int
+
+    # (rozvrh, (stale, last_fetch), platnosť do, pohľad)
+    _view_cache: Optional[
+        Tuple[
+            Dict[str, Any],
+            Tuple[bool, Optional[datetime]],
+            Optional[datetime],
+            Dict[str, Any],
+        ]
+    ] = None
+    # (pohľad, dostupnosť) pri poslednom zápise stavu
+    _written: Optional[Tuple[Optional[Dict[str, Any]], bool]] = None
+
+    @property
+    def schedule(self) -> Optional[Dict[str, Any]]:
+        """Return schedule of this entity's HDO number."""
+        if not self.coordinator.data:
+            return None
+        return self.coordinator.data.get(self._hdo_number)
+
+    @property
+    def available(self) -> bool:
+        """Return True if the schedule of this HDO number is available."""
+        return super().available and self.schedule is not None
+
+    @abstractmethod
+    def _build_view(
+        self, schedule: Dict[str, Any], now: datetime
+    ) -> Tuple[Dict[str, Any], Optional[datetime]]:
+        """
+        Vypočíta stav a atribúty entity (každá entita vlastným spôsobom).
+
+        Args:
+            schedule: Rozvrh HDO čísla z coordinatora
+            now: Aktuálny čas (s časovou zónou)
+
+        Returns:
+            Tuple (dict so 'state' a 'attributes', čas do ktorého platí
+            alebo None ak platí až do zmeny rozvrhu)
+        """
+
+    def _view(self) -> Optional[Dict[str, Any]]:
+        """Return the cached view, rebuilt when the schedule or its time bucket changes."""
+        schedule = self.schedule
+        if schedule is None:
+            return None
+
+        now = dt_util.now()
+        freshness = (self.coordinator.stale, self.coordinator.last_fetch)
+        cached = self._view_cache
+        if (
+            cached is not None
+            and cached[0] is schedule
+            and cached[1] == freshness
+            and (cached[2] is None or now < cached[2])
+        ):
+            return cached[3]
+
+        view, valid_until = self._build_view(schedule, now)
+        if cached is not None and cached[3] == view:
+            # Rovnaký obsah - ponechaj pôvodný objekt, zápis sa preskočí
+            view = cached[3]
+        self._view_cache = (schedule, freshness, valid_until, view)
+        return view
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write state only when the view or availability changed."""
+        last = self._written
+        if last is not None and last[0] is self._view() and last[1] == self.available:
+            return
+        self.async_write_ha_state()
+
+    @callback
+    def async_write_ha_state(self) -> None:
+        """Write state and remember what was written."""
+        self._written = (self._view(), self.available)
+        super().async_write_ha_state()
+
+    def _freshness_attributes(self) -> Dict[str, Any]:
+        """Return when the data was last fetched and whether stored schedules are served."""
+        # Vek dát by sa zapísaný stav neaktualizoval - je len v diagnostike
+        last_fetch = self.coordinator.last_fetch
+        return {
+            "last_fetch": dt_util.as_local(last_fetch).isoformat() if last_fetch else None,
+            "stale": self.coordinator.stale,
+        }
+
+
+class ZSEHDOTariffSensor(ZSEHDOEntity, BinarySensorEntity):
     """Binary sensor pre aktuálnu tarifu (ON = nízka, OFF = vysoká)."""
 
     def __init__(self, coordinator, entry: ConfigEntry, hdo_number: int):
@@ -59,28 +189,38 @@ class ZSEHDOTariffSensor(CoordinatorEntity, BinarySensorEntity):
         self._attr_name = f"ZSE HDO {hdo_number} Tarifa"
         self._attr_device_class = BinarySensorDeviceClass.POWER
 
+    def _build_view(
+        self, schedule: Dict[str, Any], now: datetime
+    ) -> Tuple[Dict[str, Any], Optional[datetime]]:
+        """Compute tariff state, valid until the next tariff switch."""
+        compiled = schedule["compiled"]
+        is_on = compiled.is_low_at(now)
+
+        return {
+            "state": is_on,
+            "attributes": {
+                "hdo_number": self._hdo_number,
+                "current_tariff": "low" if is_on else "high",
+                "tariff_name": "Nízka tarifa" if is_on else "Vysoká tarifa",
+                "category": schedule.get("category"),
+                "rate_type": schedule.get("rate_type", "Unknown"),
+                "last_updated": schedule.get("last_updated"),
+                "source": schedule.get("source"),
+                **self._freshness_attributes(),
+            },
+        }, compiled.next_change(now)
+
     @property
     def is_on(self) -> bool:
         """Return true if low tariff is active."""
-        if self.coordinator.data:
-            return self.coordinator.data.get("current_tariff") == "low"
-        return False
+        view = self._view()
+        return view["state"] if view else False
 
     @property
     def extra_state_attributes(self) -> Dict[str, Any]:
         """Return additional attributes."""
-        if not self.coordinator.data:
-            return {}
-        
-        return {
-            "hdo_number": self._hdo_number,
-            "current_tariff": self.coordinator.data.get("current_tariff"),
-            "tariff_name": "Nízka tarifa" if self.is_on else "Vysoká tarifa",
-            "category": self.coordinator.data.get("category"),
-            "rate_type": self.coordinator.data.get("rate_type", "Unknown"),
-            "last_updated": self.coordinator.data.get("last_updated"),
-            "source": self.coordinator.data.get("source"),
-        }
+        view = self._view()
+        return view["attributes"] if view else {}
 
     @property
     def icon(self) -> str:
@@ -88,7 +228,7 @@ class ZSEHDOTariffSensor(CoordinatorEntity, BinarySensorEntity):
         return "mdi:flash" if self.is_on else "mdi:flash-off"
 
 
-class ZSEHDONextSwitchSensor(CoordinatorEntity, SensorEntity):
+class ZSEHDONextSwitchSensor(ZSEHDOEntity, SensorEntity):
     """Sensor pre najbližšie prepnutie tarify."""
 
     def __init__(self, coordinator, entry: ConfigEntry, hdo_number: int):
@@ -100,87 +240,42 @@ class ZSEHDONextSwitchSensor(CoordinatorEntity, SensorEntity):
         self._attr_name = f"ZSE HDO {hdo_number} Ďalšie prepnutie"
         self._attr_icon = "mdi:clock-outline"
 
-    def _parse_time(self, time_str: str) -> time:
-        """Parse time string to time object."""
-        hour, minute = map(int, time_str.split(':'))
-        return time(hour=hour, minute=minute)
+    def _build_view(
+        self, schedule: Dict[str, Any], now: datetime
+    ) -> Tuple[Dict[str, Any], Optional[datetime]]:
+        """Compute the next switch, valid until the switch happens."""
+        # Binárne vyhľadávanie v týždenných hraniciach - správne aj cez
+        # polnoc a pri prechode pracovný deň ↔ víkend
+        switch = schedule["compiled"].next_switch(now)
+        if switch is None:
+            return {"state": None, "attributes": {}}, None
 
-    def _get_next_switch(self) -> Optional[Dict[str, Any]]:
-        """Calculate next tariff switch."""
-        if not self.coordinator.data:
-            return None
-        
-        now = datetime.now()
-        current_time = now.time()
-        is_weekend = now.weekday() >= 5
-        
-        schedule = self.coordinator.data
-        periods = schedule["weekend"] if is_weekend else schedule["workday"]
-        
-        # Zoradiť periody podľa času
-        sorted_periods = sorted(periods, key=lambda p: self._parse_time(p["start"]))
-        
-        # Nájsť najbližšie prepnutie
-        for period in sorted_periods:
-            start = self._parse_time(period["start"])
-            end = self._parse_time(period["end"])
-            
-            # Prepnutie na nízku
-            if start > current_time:
-                return {
-                    "time": start.strftime("%H:%M"),
-                    "datetime": datetime.combine(now.date(), start),
-                    "to_tariff": "low",
-                    "period": period
-                }
-            
-            # Prepnutie na vysokú
-            if end > current_time and start <= current_time:
-                return {
-                    "time": end.strftime("%H:%M"),
-                    "datetime": datetime.combine(now.date(), end),
-                    "to_tariff": "high",
-                    "period": period
-                }
-        
-        # Ak nič nenájdeme dnes, vráť prvé prepnutie zajtra
-        if sorted_periods:
-            first_period = sorted_periods[0]
-            start = self._parse_time(first_period["start"])
-            tomorrow = now.date() + timedelta(days=1)
-            return {
-                "time": start.strftime("%H:%M"),
-                "datetime": datetime.combine(tomorrow, start),
-                "to_tariff": "low",
-                "period": first_period
-            }
-        
-        return None
+        switch_time, to_low = switch
+        return {
+            # Stav ostáva v lokálnom čase bez časovej zóny
+            "state": switch_time.replace(tzinfo=None).isoformat(),
+            "attributes": {
+                "time": switch_time.strftime("%H:%M"),
+                "to_tariff": "low" if to_low else "high",
+                "to_tariff_name": "Nízka tarifa" if to_low else "Vysoká tarifa",
+                "rate_type": schedule.get("rate_type", "Unknown"),
+            },
+        }, switch_time
 
     @property
     def native_value(self) -> Optional[str]:
         """Return the next switch time."""
-        next_switch = self._get_next_switch()
-        if next_switch:
-            return next_switch["datetime"].isoformat()
-        return None
+        view = self._view()
+        return view["state"] if view else None
 
     @property
     def extra_state_attributes(self) -> Dict[str, Any]:
         """Return additional attributes."""
-        next_switch = self._get_next_switch()
-        if not next_switch:
-            return {}
-        
-        return {
-            "time": next_switch["time"],
-            "to_tariff": next_switch["to_tariff"],
-            "to_tariff_name": "Nízka tarifa" if next_switch["to_tariff"] == "low" else "Vysoká tarifa",
-            "rate_type": self.coordinator.data.get("rate_type", "Unknown"),
-        }
+        view = self._view()
+        return view["attributes"] if view else {}
 
 
-class ZSEHDOTodayScheduleSensor(CoordinatorEntity, SensorEntity):
+class ZSEHDOTodayScheduleSensor(ZSEHDOEntity, SensorEntity):
     """Sensor s dnešným rozvrhom."""
 
     def __init__(self, coordinator, entry: ConfigEntry, hdo_number: int):
@@ -192,33 +287,96 @@ class ZSEHDOTodayScheduleSensor(CoordinatorEntity, SensorEntity):
         self._attr_name = f"ZSE HDO {hdo_number} Dnešný rozvrh"
         self._attr_icon = "mdi:calendar-today"
 
+    def _build_view(
+        self, schedule: Dict[str, Any], now: datetime
+    ) -> Tuple[Dict[str, Any], Optional[datetime]]:
+        """Compute today's periods, valid until midnight."""
+        is_weekend = now.weekday() >= 5
+        periods = schedule["schedule"].periods(is_weekend)
+
+        attributes = {
+            "day_type": "Víkend" if is_weekend else "Pracovný deň",
+            "periods": [period.as_dict() for period in periods],
+            "period_count": len(periods),
+            "rate_type": schedule.get("rate_type", "Unknown"),
+            "category": schedule.get("category"),
+        }
+
+        # Periódy ako na webe ZSE, ak boli niektoré zlúčené
+        raw_periods = schedule["raw_schedule"].periods(is_weekend)
+        if raw_periods != periods:
+            attributes["raw_periods"] = [period.as_dict() for period in raw_periods]
+
+        midnight = dt_util.start_of_local_day(now.date() + timedelta(days=1))
+        return {"state": str(len(periods)), "attributes": attributes}, midnight
+
     @property
     def native_value(self) -> str:
         """Return the number of low tariff periods today."""
-        if not self.coordinator.data:
-            return "0"
-        
-        now = datetime.now()
-        is_weekend = now.weekday() >= 5
-        
-        periods = self.coordinator.data["weekend"] if is_weekend else self.coordinator.data["workday"]
-        return str(len(periods))
+        view = self._view()
+        return view["state"] if view else "0"
 
     @property
     def extra_state_attributes(self) -> Dict[str, Any]:
         """Return today's schedule."""
-        if not self.coordinator.data:
-            return {}
-        
-        now = datetime.now()
-        is_weekend = now.weekday() >= 5
+        view = self._view()
+        return view["attributes"] if view else {}
+
+
+class ZSEHDOMetricsSensor(CoordinatorEntity, SensorEntity):
+    """Diagnostický sensor s časmi a počítadlami aktualizácií (predvolene vypnutý).
+
+    Jeden pre celú doménu. Metriky sa zbierajú len kým je sensor povolený -
+    vypnutá entita sa do Home Assistanta nepridá a parser nemeria nič.
+    """
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_native_unit_of_measurement = UnitOfTime.MILLISECONDS
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    # Histogramy sa menia pri každej aktualizácii - do recordera sa neukladajú
+    _unrecorded_attributes = frozenset({MATCH_ALL})
+
+    def __init__(self, coordinator, entry: ConfigEntry):
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self._entry = entry
+        self._attr_unique_id = METRICS_UNIQUE_ID
+        self._attr_name = "ZSE HDO Metriky"
+        self._attr_icon = "mdi:speedometer"
+
+    async def async_added_to_hass(self) -> None:
+        """Start collecting metrics."""
+        await super().async_added_to_hass()
+        if self.coordinator.parser.metrics is None:
+            self.coordinator.parser.metrics = ZSEHDOMetrics()
+
+    async def async_will_remove_from_hass(self) -> None:
+        """Stop collecting metrics."""
+        await super().async_will_remove_from_hass()
+        self.coordinator.parser.metrics = None
+
+    @property
+    def native_value(self) -> Optional[float]:
+        """Return the duration of the last page fetch in milliseconds."""
+        metrics = self.coordinator.parser.metrics
+        if metrics is None:
+            return None
         
-        periods = self.coordinator.data["weekend"] if is_weekend else self.coordinator.data["workday"]
+        fetch_ms = metrics.last("fetch_ms")
+        return round(fetch_ms, 1) if fetch_ms is not None else None
+
+    @property
+    def extra_state_attributes(self) -> Dict[str, Any]:
+        """Return counters and rolling timings of all update stages."""
+        metrics = self.coordinator.parser.metrics
+        if metrics is None:
+            return {}
         
+        cache = self.coordinator.parser.cache
         return {
-            "day_type": "Víkend" if is_weekend else "Pracovný deň",
-            "periods": periods,
-            "period_count": len(periods),
-            "rate_type": self.coordinator.data.get("rate_type", "Unknown"),
-            "category": self.coordinator.data.get("category"),
+            **metrics.as_dict(),
+            "cache_hits": cache.hits,
+            "cache_misses": cache.misses,
         }
@@ -0,0 +1,309 @@
+"""Services for ZSE HDO Live integration.
+
+Services answer from the schedules already held by the coordinator -
+they never fetch the ZSE page themselves.
+
+Author: Miroslav Burdych (@mburdych)
+GitHub: https://github.com/mburdych/ZSED-tarify
+Support: https://buymeacoffee.com/mburdych
+
+License: MIT
+"""
+
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Tuple
+
+import voluptuous as vol
+
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    DOMAIN,
+    CONF_HDO_NUMBER,
+    DATA_COORDINATOR,
+    MAX_TRANSITION_DAYS,
+    SERVICE_CALCULATE_COST,
+    SERVICE_FIND_WINDOW,
+    SERVICE_GET_TRANSITIONS,
+)
+from .coordinator import ZSEHDOCoordinator
+from .costs import (
+    DEFAULT_INTERVAL_MINUTES,
+    calculate_costs,
+    consumption_from_statistics,
+    read_consumption_csv,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+ATTR_START = "start"
+ATTR_END = "end"
+ATTR_DAYS = "days"
+ATTR_LOW_PRICE = "low_price"
+ATTR_HIGH_PRICE = "high_price"
+ATTR_STATISTIC_ID = "statistic_id"
+ATTR_FILE = "file"
+ATTR_PERIOD = "period"
+ATTR_INTERVAL = "interval_minutes"
+ATTR_DURATION = "duration"
+ATTR_DEADLINE = "deadline"
+
+# Rozvrh sa opakuje po týždňoch - dlhšie okno nemá zmysel hľadať
+MAX_WINDOW = timedelta(weeks=1)
+# Rozvrh má minútové rozlíšenie - kratší beh nemá podiel nízkej tarify
+MIN_WINDOW = timedelta(minutes=1)
+
+# Perióda štatistík → dĺžka intervalu v minútach
+STATISTICS_PERIODS = {"5minute": 5, "hour": 60}
+
+GET_TRANSITIONS_SCHEMA = vol.Schema(
+    {
+        vol.Required(CONF_HDO_NUMBER): cv.positive_int,
+        vol.Optional(ATTR_START): cv.datetime,
+        vol.Exclusive(ATTR_END, "horizon"): cv.datetime,
+        vol.Exclusive(ATTR_DAYS, "horizon"): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=MAX_TRANSITION_DAYS)
+        ),
+    }
+)
+
+
+CALCULATE_COST_SCHEMA = vol.Schema(
+    {
+        vol.Required(CONF_HDO_NUMBER): cv.positive_int,
+        vol.Required(ATTR_LOW_PRICE): vol.Coerce(float),
+        vol.Required(ATTR_HIGH_PRICE): vol.Coerce(float),
+        vol.Exclusive(ATTR_STATISTIC_ID, "source"): cv.string,
+        vol.Exclusive(ATTR_FILE, "source"): cv.string,
+        vol.Optional(ATTR_START): cv.datetime,
+        vol.Optional(ATTR_END): cv.datetime,
+        vol.Optional(ATTR_PERIOD, default="hour"): vol.In(STATISTICS_PERIODS),
+        vol.Optional(ATTR_INTERVAL, default=DEFAULT_INTERVAL_MINUTES): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=1440)
+        ),
+    }
+)
+
+FIND_WINDOW_SCHEMA = vol.Schema(
+    {
+        vol.Required(CONF_HDO_NUMBER): cv.positive_int,
+        vol.Required(ATTR_DURATION): vol.All(
+            cv.positive_time_period, vol.Range(min=MIN_WINDOW, max=MAX_WINDOW)
+        ),
+        vol.Required(ATTR_DEADLINE): cv.datetime,
+        vol.Optional(ATTR_START): cv.datetime,
+    }
+)
+
+
+def _get_coordinator(hass: HomeAssistant) -> ZSEHDOCoordinator:
+    """Return the loaded coordinator or raise a validation error."""
+    coordinator = hass.data.get(DOMAIN, {}).get(DATA_COORDINATOR)
+    if coordinator is None or not coordinator.data:
+        raise ServiceValidationError("No ZSE HDO schedules are loaded")
+    return coordinator
+
+
+def _get_schedule(hass: HomeAssistant, hdo_number: int) -> Dict[str, Any]:
+    """Return the loaded schedule of an HDO number or raise a validation error."""
+    schedule = _get_coordinator(hass).data.get(hdo_number)
+    if schedule is None:
+        raise ServiceValidationError(f"HDO {hdo_number} not found on ZSE website")
+    return schedule
+
+
+def _round_totals(totals: Dict[str, Any]) -> Dict[str, Any]:
+    """Round energy and cost values for the service response."""
+    return {
+        key: round(value, 3) if isinstance(value, float) else value
+        for key, value in totals.items()
+    }
+
+
+async def _async_statistics_consumption(
+    hass: HomeAssistant,
+    statistic_id: str,
+    start: datetime,
+    end: datetime,
+    period: str,
+) -> Tuple[List[datetime], List[float]]:
+    """Load consumption per period from the recorder statistics."""
+    # Recorder je voliteľný - importuje sa až keď sa štatistiky použijú
+    from homeassistant.components.recorder import get_instance
+    from homeassistant.components.recorder.statistics import statistics_during_period
+
+    stats = await get_instance(hass).async_add_executor_job(
+        statistics_during_period,
+        hass,
+        dt_util.as_utc(start),
+        dt_util.as_utc(end),
+        {statistic_id},
+        period,
+        None,
+        {"change"},
+    )
+
+    return consumption_from_statistics(stats.get(statistic_id, []), dt_util.as_local)
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register ZSE HDO services."""
+    if hass.services.has_service(DOMAIN, SERVICE_GET_TRANSITIONS):
+        return
+
+    @callback
+    def async_get_transitions(call: ServiceCall) -> ServiceResponse:
+        """Return tariff transitions of an HDO number over a horizon."""
+        coordinator = _get_coordinator(hass)
+        hdo_number = call.data[CONF_HDO_NUMBER]
+        _get_schedule(hass, hdo_number)
+
+        # Časy bez časovej zóny sú v časovej zóne Home Assistanta
+        start = dt_util.as_local(call.data.get(ATTR_START) or dt_util.now())
+        if ATTR_END in call.data:
+            end = dt_util.as_local(call.data[ATTR_END])
+        else:
+            end = start + timedelta(days=call.data.get(ATTR_DAYS, 7))
+
+        if end - start > timedelta(days=MAX_TRANSITION_DAYS):
+            raise ServiceValidationError(
+                f"Horizon is limited to {MAX_TRANSITION_DAYS} days"
+            )
+
+        transitions = [
+            {
+                "datetime": transition["datetime"].isoformat(),
+                "to_tariff": transition["to_tariff"],
+            }
+            for transition in coordinator.get_transitions(hdo_number, start, end)
+        ]
+
+        return {
+            "hdo_number": hdo_number,
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "transitions": transitions,
+        }
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_TRANSITIONS,
+        async_get_transitions,
+        schema=GET_TRANSITIONS_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+
+    async def async_calculate_cost(call: ServiceCall) -> ServiceResponse:
+        """Split consumption into low/high tariff energy and cost."""
+        hdo_number = call.data[CONF_HDO_NUMBER]
+        compiled = _get_schedule(hass, hdo_number)["compiled"]
+
+        if ATTR_STATISTIC_ID in call.data:
+            # Štatistika: predvolene od začiatku mesiaca po teraz
+            end = dt_util.as_local(call.data.get(ATTR_END) or dt_util.now())
+            start = dt_util.as_local(
+                call.data.get(ATTR_START)
+                or end.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+            )
+            timestamps, consumption = await _async_statistics_consumption(
+                hass, call.data[ATTR_STATISTIC_ID], start, end, call.data[ATTR_PERIOD]
+            )
+            interval_minutes = STATISTICS_PERIODS[call.data[ATTR_PERIOD]]
+
+        elif ATTR_FILE in call.data:
+            path = call.data[ATTR_FILE]
+            if not hass.config.is_allowed_path(path):
+                raise ServiceValidationError(f"Access to {path} is not allowed")
+
+            def _read_file() -> Tuple[List[datetime], List[float]]:
+                """Read consumption CSV (blocking)."""
+                with open(path, encoding="utf-8") as file:
+                    return read_consumption_csv(file)
+
+            try:
+                timestamps, consumption = await hass.async_add_executor_job(_read_file)
+            except OSError as err:
+                raise ServiceValidationError(f"Cannot read {path}: {err}") from err
+            interval_minutes = call.data[ATTR_INTERVAL]
+
+        else:
+            raise ServiceValidationError("Either statistic_id or file is required")
+
+        # Časy so zónou sa prevedú do časovej zóny Home Assistanta, rozhoduje lokálny čas
+        timestamps = [
+            dt_util.as_local(when) if when.tzinfo is not None else when
+            for when in timestamps
+        ]
+
+        result = await hass.async_add_executor_job(
+            calculate_costs,
+            compiled,
+            timestamps,
+            consumption,
+            call.data[ATTR_LOW_PRICE],
+            call.data[ATTR_HIGH_PRICE],
+            interval_minutes,
+        )
+
+        return {
+            "hdo_number": hdo_number,
+            "readings": len(timestamps),
+            "total": _round_totals(result["total"]),
+            "daily": [_round_totals(day) for day in result["daily"]],
+            "monthly": [_round_totals(month) for month in result["monthly"]],
+        }
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_CALCULATE_COST,
+        async_calculate_cost,
+        schema=CALCULATE_COST_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+
+    @callback
+    def async_find_window(call: ServiceCall) -> ServiceResponse:
+        """Return the start of the run with the most low tariff minutes."""
+        hdo_number = call.data[CONF_HDO_NUMBER]
+        compiled = _get_schedule(hass, hdo_number)["compiled"]
+
+        # Začatá minúta sa počíta celá
+        duration = -(-int(call.data[ATTR_DURATION].total_seconds()) // 60)
+        earliest = dt_util.as_local(call.data.get(ATTR_START) or dt_util.now())
+        deadline = dt_util.as_local(call.data[ATTR_DEADLINE])
+
+        window = compiled.best_window(earliest, deadline, duration)
+        if window is None:
+            raise ServiceValidationError(
+                f"A {duration} minute run does not fit before {deadline.isoformat()}"
+            )
+
+        start, low_minutes = window
+        return {
+            "hdo_number": hdo_number,
+            "start": start.isoformat(),
+            "end": (start + timedelta(minutes=duration)).isoformat(),
+            "duration_minutes": duration,
+            "low_minutes": low_minutes,
+            "high_minutes": duration - low_minutes,
+            "low_share": round(low_minutes / duration, 3),
+        }
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_FIND_WINDOW,
+        async_find_window,
+        schema=FIND_WINDOW_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
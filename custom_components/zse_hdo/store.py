@@ -0,0 +1,87 @@
+"""Persistent schedule snapshot for ZSE HDO Live integration.
+
+Keeps the last good parsed schedules in Home Assistant storage so entities
+can come up immediately after a restart, even if zsdis.sk is slow or down.
+It also remembers when the schedule content changed, which the coordinator
+uses to space out scheduled updates.
+
+Author: Miroslav Burdych (@mburdych)
+GitHub: https://github.com/mburdych/ZSED-tarify
+Support: https://buymeacoffee.com/mburdych
+
+License: MIT
+"""
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN, STORAGE_VERSION, STORAGE_SAVE_DELAY, CHANGE_HISTORY_SIZE
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_KEY = f"{DOMAIN}.schedules"
+
+
+class ZSEHDOScheduleStore:
+    """Snapshot posledných platných rozvrhov na disku."""
+
+    def __init__(self, hass: HomeAssistant):
+        """Initialize store."""
+        self._store: Store = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+        self._saved_hash: Optional[str] = None
+        self.loaded = False
+
+        # Kedy sa obsah rozvrhu na webe zmenil (UTC, vzostupne) a odkedy sa sleduje
+        self.changes: List[datetime] = []
+        self.observed_since: Optional[datetime] = None
+
+    async def async_load(self) -> Optional[Dict[str, Any]]:
+        """Načítaj uložený snapshot (None ak neexistuje)."""
+        snapshot = await self._store.async_load()
+        self.loaded = True
+
+        if not snapshot:
+            return None
+
+        self._saved_hash = snapshot.get("content_hash")
+        self.changes = [
+            changed
+            for changed in map(dt_util.parse_datetime, snapshot.get("changes", []))
+            if changed is not None
+        ]
+        self.observed_since = dt_util.parse_datetime(snapshot.get("observed_since") or "")
+        _LOGGER.debug(
+            f"Loaded stored HDO snapshot ({len(snapshot.get('rates', []))} codes)"
+        )
+        return snapshot
+
+    @callback
+    def async_save(self, snapshot: Optional[Dict[str, Any]]) -> None:
+        """Naplánuj uloženie snapshotu ak sa obsah zmenil a zaznamenaj zmenu."""
+        if not snapshot or snapshot.get("content_hash") == self._saved_hash:
+            return
+
+        now = dt_util.utcnow()
+        if self._saved_hash is not None:
+            self.changes = (self.changes + [now])[-CHANGE_HISTORY_SIZE:]
+        if self.observed_since is None:
+            self.observed_since = now
+
+        self._saved_hash = snapshot.get("content_hash")
+        data = {
+            **snapshot,
+            "changes": [changed.isoformat() for changed in self.changes],
+            "observed_since": self.observed_since.isoformat(),
+        }
+        self._store.async_delay_save(lambda: data, STORAGE_SAVE_DELAY)
+
+    async def async_remove(self) -> None:
+        """Zmaž snapshot (po odstránení poslednej config entry)."""
+        self._saved_hash = None
+        self.changes = []
+        self.observed_since = None
+        await self._store.async_remove()
@@ -0,0 +1,110 @@
+"""
+ZSE HDO Rate Table Stream
+=========================
+
+Vyberá JavaScript polia s HDO tabuľkami (var household_rates = [...])
+z HTML prichádzajúceho po častiach. Uchováva len text samotných polí,
+zvyšok stránky zahadzuje a po uzavretí všetkých polí hlási koniec, takže
+sťahovanie sa môže zastaviť skôr.
+
+Author: Miroslav Burdych (@mburdych)
+GitHub: https://github.com/mburdych/ZSED-tarify
+Support: https://buymeacoffee.com/mburdych
+
+License: MIT
+"""
+
+import re
+from typing import Dict, Iterable, Optional
+
+from .jsliteral import LiteralScanner
+
+# Koľko znakov z konca prehľadaného textu ponechať - deklarácia premennej
+# môže byť rozdelená medzi dve časti
+_SEARCH_OVERLAP = 256
+
+
+class RateTableStream:
+    """Inkrementálny výber JavaScript polí zo streamovaného HTML."""
+
+    def __init__(self, var_names: Iterable[str]):
+        """
+        Initialize stream.
+
+        Args:
+            var_names: Názvy JavaScript premenných, ktoré treba vybrať
+        """
+        self._remaining = list(var_names)
+        self._literals: Dict[str, str] = {}
+        self._search = ""
+        self._current: Optional[str] = None
+        self._scanner: Optional[LiteralScanner] = None
+        self._pattern = self._compile(self._remaining)
+        self.received = 0
+
+    @staticmethod
+    def _compile(var_names: Iterable[str]) -> "re.Pattern[str]":
+        """Regex pre deklaráciu ktorejkoľvek z (zostávajúcich) premenných."""
+        names = "|".join(re.escape(name) for name in var_names)
+        return re.compile(rf"var\s+({names})\s*=\s*(?=\[)")
+
+    @property
+    def done(self) -> bool:
+        """Return True when all requested arrays were captured."""
+        return not self._remaining and self._scanner is None
+
+    def feed(self, text: str) -> bool:
+        """
+        Spracuje ďalšiu časť HTML.
+
+        Args:
+            text: Dekódovaná časť HTML
+
+        Returns:
+            True ak sú všetky polia kompletné (ďalšie čítanie netreba)
+
+        Raises:
+            JSLiteralError: Ak za deklaráciou nenasleduje pole
+        """
+        self.received += len(text)
+
+        while text and not self.done:
+            if self._scanner is not None:
+                rest = self._scanner.feed(text)
+                if rest is None:
+                    return False
+                self._literals[self._current] = self._scanner.literal
+                self._current = None
+                self._scanner = None
+                text = rest
+                continue
+
+            buffer = self._search + text
+            match = self._pattern.search(buffer)
+            if match is None:
+                self._search = buffer[-_SEARCH_OVERLAP:]
+                return False
+
+            self._current = match.group(1)
+            self._remaining.remove(self._current)
+            if self._remaining:
+                self._pattern = self._compile(self._remaining)
+            self._scanner = LiteralScanner()
+            self._search = ""
+            text = buffer[match.end():]
+
+        return self.done
+
+    def to_html(self) -> str:
+        """
+        Zostaví minimálny dokument s vybranými poľami.
+
+        Polia sú v ňom v pôvodnom texte, takže ho možno parsovať
+        rovnako ako celú stránku.
+
+        Returns:
+            Text v tvare "var household_rates = [...];" pre každé úplné pole
+        """
+        return "\n".join(
+            f"var {name} = {literal};" for name, literal in self._literals.items()
+        )